@@ -3,24 +3,369 @@
 Classes for managing vectors in a vector store.
 """
 
+import ctypes
+import hashlib
+import json
+import logging
 import os
 import pickle
+import tempfile
+import threading
+import time
+import warnings
+import zlib
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import IO, Any, Callable, Dict, Hashable, List, Literal, NamedTuple, Tuple
 
 import numpy as np
 from pinecone import Pinecone, ServerlessSpec, Index
 import requests
-from faiss import IndexFlatIP, normalize_L2, read_index, write_index, serialize_index, deserialize_index
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from faiss import (
+    METRIC_INNER_PRODUCT,
+    IndexFlatCodes,
+    IndexFlatIP,
+    IndexIDMap2,
+    IndexScalarQuantizer,
+    ParameterSpace,
+    PyCallbackIOReader,
+    ResultHeap,
+    ScalarQuantizer,
+    clone_index,
+    deserialize_index,
+    downcast_index,
+    extract_index_ivf,
+    get_num_gpus,
+    index_cpu_to_all_gpus,
+    index_factory as index_factory_,
+    knn,
+    normalize_L2,
+    read_index,
+    serialize_index,
+    vector_to_array,
+    write_index,
+)
 from pinecone.core.client.configuration import Configuration as OpenApiConfiguration
 from supabase import create_client
+from tqdm.auto import tqdm
 from typing_extensions import override
-import firebase_admin
 from firebase_admin import storage
 
 from softtek_llm.schemas import Vector
 
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import get_num_threads, njit, prange
+except ImportError:
+    njit = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    # Only glibc can return the memory freed by Python and FAISS to the OS on demand
+    _libc = ctypes.CDLL("libc.so.6")
+    _libc.malloc_trim
+except (OSError, AttributeError):
+    _libc = None
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# Files are kept in memory up to this size, and spilled to disk above it
+_SPOOL_SIZE = 64 * 1024 * 1024
+# Size of the chunks compressed at once and sent to Firebase Storage
+_CHUNK_SIZE = 8 * 1024 * 1024
+# Quantized embeddings are decoded to float32 in blocks of this many rows when searched
+_DECODE_ROWS = 8192
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """
+    Serializes the given object to JSON with orjson, or with json when orjson is not installed.
+
+    Args:
+        `obj` (Any): The object to serialize. NumPy arrays are supported when orjson is installed.
+
+    Returns:
+        `data` (bytes): The UTF-8 encoded JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(obj).encode()
+
+
+def _json_loads(data: bytes | str) -> Any:
+    """
+    Deserializes the given JSON with orjson, or with json when orjson is not installed.
+
+    Args:
+        `data` (bytes | str): The JSON to deserialize.
+
+    Returns:
+        `obj` (Any): The deserialized object.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _decompress(data: bytes) -> bytes:
+    """
+    Decompresses bytes compressed by `_CompressedWriter`, detecting the format from their header.
+    Bytes that are not compressed are returned unchanged.
+
+    Args:
+        `data` (bytes): The bytes to decompress.
+
+    Returns:
+        `decompressed` (bytes): The decompressed bytes.
+
+    Raises:
+        RuntimeError: if the data is compressed with zstd and zstandard is not installed.
+    """
+    if data[:4] == _ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("zstandard must be installed to read zstd data.")
+        # Frames written by `_CompressedWriter` are streamed, so their header has no content size
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    if data[:1] == b"\x78":
+        return zlib.decompress(data)
+    return data
+
+
+class _CompressedWriter:
+    """
+    # Compressed Writer
+    File-like object that compresses everything written to it into another file, with zstd, or with zlib when zstandard is not installed. The data is compressed by chunks, so it is never copied as a whole.
+
+    ## Methods
+    - `write(data: bytes | np.ndarray) -> int`: Compresses the given bytes into the file.
+    - `close()`: Flushes the remaining compressed bytes into the file.
+    """
+
+    def __init__(self, file: IO[bytes]):
+        """
+        Initializes the CompressedWriter class.
+
+        Args:
+            `file` (IO[bytes]): The file to which the compressed bytes are written.
+        """
+        self.__file = file
+        self.__compressor = (
+            zstandard.ZstdCompressor(level=3).compressobj()
+            if zstandard is not None
+            else zlib.compressobj(3)
+        )
+
+    def __enter__(self) -> "_CompressedWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.close()
+
+    def write(self, data: bytes | np.ndarray) -> int:
+        """
+        Compresses the given bytes into the file.
+
+        Args:
+            `data` (bytes | np.ndarray): The bytes to compress. Contiguous arrays are read in place, without copying them to bytes.
+
+        Returns:
+            `size` (int): The number of bytes written.
+        """
+        view = memoryview(data).cast("B")
+        for start in range(0, len(view), _CHUNK_SIZE):
+            self.__file.write(
+                self.__compressor.compress(view[start : start + _CHUNK_SIZE])
+            )
+        return len(view)
+
+    def close(self):
+        """Flushes the remaining compressed bytes into the file."""
+        self.__file.write(self.__compressor.flush())
+
+
+class _DecompressedReader:
+    """
+    # Decompressed Reader
+    File-like object that decompresses a file written by `_CompressedWriter` while it is read, detecting the format from its header. Files that are not compressed are read unchanged. The file is decompressed by chunks, so it is never held in memory as a whole.
+
+    ## Methods
+    - `read(size: int) -> bytes`: Reads up to `size` decompressed bytes.
+    """
+
+    def __init__(self, file: IO[bytes]):
+        """
+        Initializes the DecompressedReader class.
+
+        Args:
+            `file` (IO[bytes]): The file to decompress, positioned at its start.
+
+        Raises:
+            RuntimeError: if the file is compressed with zstd and zstandard is not installed.
+        """
+        header = file.read(4)
+        file.seek(-len(header), os.SEEK_CUR)
+
+        self.__file = file
+        self.__pending = bytearray()
+        if header == _ZSTD_MAGIC:
+            if zstandard is None:
+                raise RuntimeError("zstandard must be installed to read zstd data.")
+            self.__decompressor = zstandard.ZstdDecompressor().decompressobj()
+        elif header[:1] == b"\x78":
+            self.__decompressor = zlib.decompressobj()
+        else:
+            self.__decompressor = None
+
+    def read(self, size: int) -> bytes:
+        """
+        Reads up to `size` decompressed bytes.
+
+        Args:
+            `size` (int): The maximum number of bytes to read.
+
+        Returns:
+            `data` (bytes): The decompressed bytes, empty at the end of the file.
+        """
+        if self.__decompressor is None:
+            return self.__file.read(size)
+
+        while len(self.__pending) < size:
+            chunk = self.__file.read(_CHUNK_SIZE)
+            if not chunk:
+                self.__pending += self.__decompressor.flush()
+                break
+            self.__pending += self.__decompressor.decompress(chunk)
+
+        data = bytes(self.__pending[:size])
+        del self.__pending[:size]
+        return data
+
+
+if njit is not None:
+
+    def _make_topk_ip_kernel(d: int) -> Callable:
+        """
+        Compiles a kernel specialized for embeddings of dimension `d`.
+        Since `d` is a compile-time constant of the kernel, LLVM can fully unroll and vectorize the inner product.
+
+        Args:
+            `d` (int): The dimension of the embeddings.
+
+        Returns:
+            `kernel` (Callable): The kernel, with the same signature as `_topk_ip`.
+        """
+
+        @njit(parallel=True, fastmath=True)
+        def kernel(
+            matrix: np.ndarray, query: np.ndarray, k: int
+        ) -> Tuple[np.ndarray, np.ndarray]:
+            n = matrix.shape[0]
+
+            norm = np.float32(0.0)
+            for j in range(d):
+                norm += query[j] * query[j]
+            scale = np.float32(1.0 / np.sqrt(norm)) if norm > 0 else np.float32(1.0)
+
+            n_chunks = max(1, min(get_num_threads(), n))
+            chunk = (n + n_chunks - 1) // n_chunks
+            best_scores = np.full((n_chunks, k), -np.inf, dtype=np.float32)
+            best_positions = np.full((n_chunks, k), -1, dtype=np.int64)
+
+            for c in prange(n_chunks):
+                for i in range(c * chunk, min(n, (c + 1) * chunk)):
+                    score = np.float32(0.0)
+                    for j in range(d):
+                        score += matrix[i, j] * query[j]
+                    score *= scale
+
+                    if score > best_scores[c, k - 1]:
+                        pos = k - 1
+                        while pos > 0 and best_scores[c, pos - 1] < score:
+                            best_scores[c, pos] = best_scores[c, pos - 1]
+                            best_positions[c, pos] = best_positions[c, pos - 1]
+                            pos -= 1
+                        best_scores[c, pos] = score
+                        best_positions[c, pos] = i
+
+            scores = best_scores.ravel()
+            positions = best_positions.ravel()
+            order = np.argsort(-scores)[:k]
+
+            return scores[order], positions[order]
+
+        return kernel
+
+    _topk_ip_kernels: Dict[int, Callable] = dict()
+    _topk_ip_lock = threading.Lock()
+
+    def _topk_ip(
+        matrix: np.ndarray, query: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Normalizes the query and finds the `k` rows of `matrix` with the highest inner product in a single pass.
+        Each thread keeps a sorted top `k` of its chunk of rows and the partial results are merged at the end.
+        The kernel is compiled once for each dimension, and runs one call at a time: numba's default threading layer does not support parallel kernels launched concurrently from several threads, and each call already uses all the cores.
+
+        Args:
+            `matrix` (np.ndarray): The L2-normalized float32 embeddings, one per row.
+            `query` (np.ndarray): The float32 query embeddings.
+            `k` (int): The number of rows to return. Must not be greater than the number of rows.
+
+        Returns:
+            `scores` (np.ndarray): The inner product of each returned row, in descending order.
+            `positions` (np.ndarray): The positions of the returned rows.
+        """
+        d = matrix.shape[1]
+
+        with _topk_ip_lock:
+            if d not in _topk_ip_kernels:
+                _topk_ip_kernels[d] = _make_topk_ip_kernel(d)
+
+            return _topk_ip_kernels[d](matrix, query, k)
+
+else:
+
+    def _topk_ip(
+        matrix: np.ndarray, query: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        NumPy fallback of the numba kernel, used when numba is not installed.
+
+        Args:
+            `matrix` (np.ndarray): The L2-normalized float32 embeddings, one per row.
+            `query` (np.ndarray): The float32 query embeddings.
+            `k` (int): The number of rows to return. Must not be greater than the number of rows.
+
+        Returns:
+            `scores` (np.ndarray): The inner product of each returned row, in descending order.
+            `positions` (np.ndarray): The positions of the returned rows.
+        """
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        scores = matrix @ query
+        positions = np.argpartition(-scores, k - 1)[:k]
+        positions = positions[np.argsort(-scores[positions])]
+
+        return scores[positions], positions
+
 
 class VectorStore(ABC):
     """
@@ -87,6 +432,122 @@ class VectorStore(ABC):
     def index() -> Index:
         ...
 
+
+class _QueryCache:
+    """
+    # Query Cache
+    Semantic cache of search results. A cached result is reused when a new query vector has a cosine similarity of at least `threshold` with the cached query vector and the same search arguments.
+    It is safe to use from multiple threads.
+
+    ## Methods
+    - `get(key: Hashable, embeddings: List[float]) -> List[Vector] | None`: Returns the cached results of a similar query, if any.
+    - `put(key: Hashable, embeddings: List[float], results: List[Vector])`: Caches the results of a query.
+    - `clear()`: Removes all the cached results.
+    """
+
+    def __init__(self, max_size: int, threshold: float, max_keys: int = 64):
+        """
+        Initializes the QueryCache class.
+
+        Args:
+            `max_size` (int): The maximum number of cached queries for each set of search arguments. The oldest query is evicted first.
+            `threshold` (float): The minimum cosine similarity between two query vectors to reuse the cached results.
+            `max_keys` (int, optional): The maximum number of sets of search arguments that are cached. The least recently used one is evicted first. The default is 64.
+        """
+        self.__max_size = max_size
+        self.__threshold = threshold
+        self.__max_keys = max_keys
+        self.__lock = threading.Lock()
+        self.__entries: OrderedDict[
+            Hashable, Tuple[np.ndarray, List[List[Vector]], int]
+        ] = OrderedDict()
+
+    @staticmethod
+    def __normalize(embeddings: List[float]) -> np.ndarray:
+        query = np.asarray(embeddings, dtype=np.float32)
+        norm = np.linalg.norm(query)
+
+        return query / norm if norm > 0 else query
+
+    def get(self, key: Hashable, embeddings: List[float]) -> List[Vector] | None:
+        """
+        Returns the cached results of a similar query, if any.
+
+        Args:
+            `key` (Hashable): The search arguments, other than the query vector.
+            `embeddings` (List[float]): The query vector.
+
+        Returns:
+            `results` (List[Vector] | None): The cached results or `None` on a cache miss.
+        """
+        query = self.__normalize(embeddings)
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            self.__entries.move_to_end(key)
+
+            queries, results, count = entry
+            size = min(count, self.__max_size)
+            if size == 0 or query.shape[0] != queries.shape[1]:
+                return None
+
+            scores = queries[:size] @ query
+            best = int(np.argmax(scores))
+
+            if scores[best] < self.__threshold:
+                return None
+
+            # Callers may modify the returned vectors, e.g. `Cache` pops their score
+            return [vector.model_copy(deep=True) for vector in results[best]]
+
+    def put(self, key: Hashable, embeddings: List[float], results: List[Vector]):
+        """
+        Caches the results of a query. If the cache of the search arguments is full, the oldest query is replaced.
+
+        Args:
+            `key` (Hashable): The search arguments, other than the query vector.
+            `embeddings` (List[float]): The query vector.
+            `results` (List[Vector]): The results of the query.
+        """
+        query = self.__normalize(embeddings)
+        results = [vector.model_copy(deep=True) for vector in results]
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None or entry[0].shape[1] != query.shape[0]:
+                entry = (np.empty((1, query.shape[0]), np.float32), [], 0)
+
+            queries, cached_results, count = entry
+            slot = count % self.__max_size
+
+            # The buffer grows with the cached queries, up to `max_size` rows
+            if slot >= len(queries):
+                new_queries = np.empty(
+                    (min(2 * len(queries), self.__max_size), queries.shape[1]),
+                    np.float32,
+                )
+                new_queries[: len(queries)] = queries
+                queries = new_queries
+
+            queries[slot] = query
+            if slot < len(cached_results):
+                cached_results[slot] = results
+            else:
+                cached_results.append(results)
+
+            self.__entries[key] = (queries, cached_results, count + 1)
+            self.__entries.move_to_end(key)
+            if len(self.__entries) > self.__max_keys:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        """Removes all the cached results."""
+        with self.__lock:
+            self.__entries.clear()
+
+
 class PineconeVectorStore(VectorStore):
     """
     # Pinecone Vector Store
@@ -98,79 +559,128 @@ class PineconeVectorStore(VectorStore):
     - `index_name` (str): The name of the index where vectors will be stored and retrieved.
 
     ## Methods
-    - `add(vectors: List[Vector], namespace: str | None = None, batch_size: int | None = None, show_progress: bool = True, **kwargs: Any)`: Add vectors to the index.
+    - `add(vectors: List[Vector], namespace: str | None = None, batch_size: int = 100, show_progress: bool = True, **kwargs: Any)`: Add vectors to the index.
     - `delete(ids: List[str] | None = None, delete_all: bool | None = None, namespace: str | None = None, filter: Dict | None = None, **kwargs: Any)`: Delete vectors from the index.
-    - `search(vector: Vector | None = None, id: str | None = None, top_k: int = 1, namespace: str | None = None, filter: Dict | None = None, **kwargs: Any) -> List[Vector]`: Search for vectors in the index.
+    - `search(vector: Vector | None = None, id: str | None = None, top_k: int = 1, namespace: str | None = None, filter: Dict | None = None, include_values: bool = False, include_metadata: bool = True, **kwargs: Any) -> List[Vector]`: Search for vectors in the index.
+    - `search_batch(vectors: List[Vector], top_k: int = 1, namespace: str | None = None, filter: Dict | None = None, **kwargs: Any) -> List[List[Vector]]`: Search for the closest vectors of each query vector in parallel.
+    - `namespace_exists(namespace: str) -> bool`: Checks if the namespace exists in the index.
     """
 
+    STATS_TTL = 5.0
+    """Seconds during which the index stats used by `namespace_exists` are reused."""
+
     @override
     def __init__(
-        self, api_key: str, index_name: str):
+        self,
+        api_key: str,
+        index_name: str,
+        pool_threads: int = 30,
+        use_grpc: bool = True,
+        cache_size: int = 0,
+        cache_threshold: float = 0.97,
+    ):
         """
         Initialize a PineconeVectorStore object for managing vectors in a Pinecone index.
 
         Args:
             `api_key` (str): The API key for authentication with the Pinecone service.
-            `environment` (str): The Pinecone environment to use (e.g., "production" or "sandbox").
             `index_name` (str): The name of the index where vectors will be stored and retrieved.
-            `proxy` (str | None, optional): The proxy URL to use for requests. Defaults to None.
+            `pool_threads` (int, optional): The number of threads used to send batches of vectors in parallel. Defaults to 30.
+            `use_grpc` (bool, optional): Whether to use the gRPC client, which requires `pinecone-client[grpc]`. If it is not installed, the REST client is used. Defaults to True.
+            `cache_size` (int, optional): The number of query vectors whose results are cached for each set of search arguments. If 0, the cache is disabled. Defaults to 0.
+            `cache_threshold` (float, optional): The minimum cosine similarity between two query vectors to reuse cached results. Defaults to 0.97.
 
         Note:
-            Make sure to use a valid API key and specify the desired environment and index name.
+            Make sure to use a valid API key and specify the desired index name.
         """
-        self.__pc = Pinecone(api_key=api_key)
+        self.__pc = Pinecone(api_key=api_key, pool_threads=pool_threads)
+        self.__pool_threads = pool_threads
+        self.__stats_cache: Tuple[float, Any] = (0.0, None)
+        self.__query_cache = (
+            _QueryCache(cache_size, cache_threshold) if cache_size > 0 else None
+        )
 
         if index_name not in self.__pc.list_indexes().names():
             self.__pc.create_index(index_name, 1536, ServerlessSpec(cloud="aws", region="us-east-1"))
 
-        self.__index = self.__pc.Index(index_name)
+        if use_grpc:
+            try:
+                from pinecone.grpc import PineconeGRPC
+            except ImportError:
+                use_grpc = False
+
+        if use_grpc:
+            self.__index = PineconeGRPC(api_key=api_key).Index(index_name)
+        else:
+            self.__index = self.__pc.Index(index_name, pool_threads=pool_threads)
 
     @override
     def add(
         self,
         vectors: List[Vector],
         namespace: str | None = None,
-        batch_size: int | None = None,
+        batch_size: int = 100,
         show_progress: bool = True,
         **kwargs: Any,
     ):
-        """Add vectors to the index.
+        """Add vectors to the index. The vectors are sent in batches that are upserted in parallel.
 
         Args:
             `vectors` (List[Vector]): A list of Vector objects to add to the index. Note that each vector must have a unique ID.
             `namespace` (str | None, optional): The namespace to write to. If not specified, the default namespace is used. Defaults to None.
-            `batch_size` (int | None, optional): The number of vectors to upsert in each batch. If not specified, all vectors will be upserted in a single batch. Defaults to None.
-            `show_progress` (bool, optional): Whether to show a progress bar using tqdm. Applied only if batch_size is provided. Defaults to True.
+            `batch_size` (int, optional): The number of vectors to upsert in each batch. Defaults to 100.
+            `show_progress` (bool, optional): Whether to show a progress bar using tqdm. Applied only if there is more than one batch. Defaults to True.
             `**kwargs` (Any): Additional arguments.
 
         Raises:
             ValueError: If any of the vectors do not have a unique ID.
+            ValueError: If `batch_size` is not a positive integer.
         """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer.")
 
-        if "metadata" in kwargs:
-            metadata:Dict = kwargs["metadata"]
-        else:
-            metadata:Dict = {}
+        metadata: Dict = kwargs.pop("metadata", {})
 
         data_to_add = []
-        ids = {}
+        ids = set()
         for vector in vectors:
             if not vector.id:
                 raise ValueError("Vector ID cannot be empty when adding to Pinecone.")
-            if ids.get(vector.id, None) is not None:
+            if vector.id in ids:
                 raise ValueError(
                     f"Vector ID {vector.id} is not unique to this batch. Please make sure all vectors have unique IDs."
                 )
             data_to_add.append((vector.id, vector.embeddings, {**metadata, **vector.metadata}))
-            ids[vector.id] = 1
+            ids.add(vector.id)
+
+        async_results = [
+            self.__index.upsert(
+                vectors=data_to_add[i : i + batch_size],
+                namespace=namespace,
+                async_req=True,
+                **kwargs,
+            )
+            for i in range(0, len(data_to_add), batch_size)
+        ]
 
-        self.__index.upsert(
-            data_to_add,
-            namespace=namespace,
-            batch_size=batch_size,
-            show_progress=show_progress,
-            **kwargs,
-        )
+        for async_result in tqdm(
+            async_results,
+            desc="Upserted batches",
+            disable=not show_progress or len(async_results) <= 1,
+        ):
+            # REST requests return an ApplyResult and gRPC requests a future
+            if hasattr(async_result, "get"):
+                async_result.get()
+            else:
+                async_result.result()
+
+        # Pinecone stores the default namespace as ""
+        stats = self.__stats_cache[1]
+        if stats is not None and (namespace or "") not in stats.namespaces:
+            self.__stats_cache = (0.0, None)
+
+        if self.__query_cache is not None:
+            self.__query_cache.clear()
 
     @override
     def delete(
@@ -194,6 +704,12 @@ class PineconeVectorStore(VectorStore):
             ids=ids, delete_all=delete_all, namespace=namespace, filter=filter, **kwargs
         )
 
+        if delete_all:
+            self.__stats_cache = (0.0, None)
+
+        if self.__query_cache is not None:
+            self.__query_cache.clear()
+
     @override
     def search(
         self,
@@ -202,6 +718,8 @@ class PineconeVectorStore(VectorStore):
         top_k: int = 1,
         namespace: str | None = None,
         filter: Dict | None = None,
+        include_values: bool = False,
+        include_metadata: bool = True,
         **kwargs: Any,
     ) -> List[Vector]:
         """Search for vectors in the index.
@@ -212,11 +730,26 @@ class PineconeVectorStore(VectorStore):
             `top_k` (int, optional): The number of results to return for each query. Defaults to 1.
             `namespace` (str | None, optional): The namespace to fetch vectors from. If not specified, the default namespace is used. Defaults to None.
             `filter` (Dict | None, optional): The filter to apply. You can use vector metadata to limit your search. Defaults to None.
+            `include_values` (bool, optional): Whether to fetch the embeddings of the results. If False, the returned vectors have empty embeddings. Defaults to False.
+            `include_metadata` (bool, optional): Whether to fetch the metadata of the results. Defaults to True.
             `**kwargs` (Any): Additional arguments.
 
         Returns:
             `vectors` (List[Vector]): A list of Vector objects containing the search results.
         """
+        if vector and self.__query_cache is not None:
+            cache_key = (
+                namespace,
+                top_k,
+                include_values,
+                include_metadata,
+                json.dumps(filter, sort_keys=True, default=str),
+                json.dumps(kwargs, sort_keys=True, default=str),
+            )
+            cached = self.__query_cache.get(cache_key, vector.embeddings)
+            if cached is not None:
+                return cached
+
         # TODO: Default queries and sparse_vector parameters. Is QueryVector class iterable?
         query_response = self.__index.query(
             vector=vector.embeddings if vector else None,
@@ -224,36 +757,111 @@ class PineconeVectorStore(VectorStore):
             top_k=top_k,
             namespace=namespace,
             filter=filter,
-            include_values=True,
-            include_metadata=True,
+            include_values=include_values,
+            include_metadata=include_metadata,
             **kwargs,
         )
 
+        base_metadata = dict(vector.metadata) if vector else {}
+
         vectors = []
         for match in query_response.matches:
-            metadata = vector.metadata if vector else {}
-            if match.metadata:
-                metadata.update(match.metadata)
-            metadata.update({"score": match.score})
             vectors.append(
                 Vector(
-                    embeddings=match.values,
+                    embeddings=match.values if include_values else [],
                     id=match.id,
-                    metadata=metadata,
+                    metadata={
+                        **base_metadata,
+                        **(match.metadata or {}),
+                        "score": match.score,
+                    },
                 )
             )
 
+        if vector and self.__query_cache is not None:
+            self.__query_cache.put(cache_key, vector.embeddings, vectors)
+
         return vectors
 
-    def namespace_exists(self, namespace: str):
-        namespaces = self.__index.describe_index_stats().namespaces
-        return namespace in namespaces
+    def search_batch(
+        self,
+        vectors: List[Vector],
+        top_k: int = 1,
+        namespace: str | None = None,
+        filter: Dict | None = None,
+        **kwargs: Any,
+    ) -> List[List[Vector]]:
+        """Search for the closest vectors of each query vector. The queries are sent in parallel.
+
+        Args:
+            `vectors` (List[Vector]): The query vectors.
+            `top_k` (int, optional): The number of results to return for each query. Defaults to 1.
+            `namespace` (str | None, optional): The namespace to fetch vectors from. If not specified, the default namespace is used. Defaults to None.
+            `filter` (Dict | None, optional): The filter to apply. You can use vector metadata to limit your search. Defaults to None.
+            `**kwargs` (Any): Additional arguments.
+
+        Returns:
+            `results` (List[List[Vector]]): The search results of each query vector, in the same order as `vectors`.
+        """
+        if not vectors:
+            return []
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.__pool_threads, len(vectors))
+        ) as executor:
+            return list(
+                executor.map(
+                    lambda vector: self.search(
+                        vector=vector,
+                        top_k=top_k,
+                        namespace=namespace,
+                        filter=filter,
+                        **kwargs,
+                    ),
+                    vectors,
+                )
+            )
+
+    def namespace_exists(self, namespace: str) -> bool:
+        """Checks if the namespace exists in the index. The index stats are reused for `STATS_TTL` seconds, or until `add` creates a namespace or `delete` removes one with `delete_all`.
+
+        Args:
+            `namespace` (str): The namespace to look for.
+
+        Returns:
+            `exists` (bool): Whether the namespace exists.
+        """
+        now = time.monotonic()
+        timestamp, stats = self.__stats_cache
+
+        if stats is None or now - timestamp >= self.STATS_TTL:
+            stats = self.__index.describe_index_stats()
+            self.__stats_cache = (now, stats)
+
+        return namespace in stats.namespaces
     
     @property
     def index(self):
         return self.__index
     
 
+class _Snapshot(NamedTuple):
+    """
+    # Snapshot
+    View of a FAISSVectorStore namespace that searches read without taking any lock.
+    Writers only append past the `norm_matrix` rows of a published snapshot, and publish a new one for any other change.
+    """
+
+    # None for flat indexes searched on the CPU, which are scanned through `norm_matrix`
+    index: Any
+    local_id: List[Vector]
+    id_to_pos: Dict[int, int]
+    norm_matrix: np.ndarray
+    # Whether the index is an exact IndexFlatIP, checked on the CPU index since
+    # GPU copies (e.g. IndexReplicas) do not expose the inner index
+    exact: bool
+
+
 class FAISSVectorStore(VectorStore):
     """
     # FAISS Vector Store
@@ -262,17 +870,36 @@ class FAISSVectorStore(VectorStore):
     ## Attributes
     - `local_id` (Dict[str | None, List[Vector]]): A dictionary with the list of Vector objects of each namespace.
     - `index` (Dict[str | None, Any]): A dictionary with the FAISS index of each namespace.
+    - `index_factory` (str): The FAISS index factory string used to build the index of each namespace.
+    - `quantization` (Literal["fp32", "fp16", "int8"]): The precision used to store the embeddings of flat indexes.
+    - `gpu` (bool): Whether the searches run on the GPUs.
 
     ## Methods
     - `__return_ids(ids: List[str], namespace: str | None) -> np.array`: Creates a Numpy array with the positional ids of the given Vectors ids.
-    - `__return_embeddings(id: str, namespace: str | None) -> np.array`: Creates a Numpy array with the embeddings of the given Vector id.
-    - `__return_vectors(ids: List[int], distance: List[float], namespace: str | None) -> List[Vector]`: Updates the score in the metadata of each Vector object, and creates a list of Vector objects given their positional ids.
+    - `__return_embeddings(id: str, snapshot: _Snapshot, namespace: str | None) -> np.array`: Creates a Numpy array with the embeddings of the given Vector id.
+    - `__return_vectors(positions: np.ndarray, distance: np.ndarray, snapshot: _Snapshot) -> List[Vector]`: Creates a list of Vector objects given their positional ids, with their score added to a copy of their metadata.
     - `__remove_ids(ids: List[str], namespace: str | None)`: Removes the given Vector objects from the `local_id` list.
+    - `__new_flat_index(d: int, quantization: Literal["fp32", "fp16", "int8"] | None = None) -> Any`: Creates an empty flat FAISS index with the precision set by `quantization`.
+    - `__quantized_copy(namespace: str | None, precision: Literal["fp32", "fp16", "int8"]) -> Any`: Copies the index of a namespace into a flat index with the given precision.
+    - `__new_index(d: int, training_data: np.ndarray | None = None) -> IndexIDMap2`: Creates an empty FAISS index using `index_factory`.
+    - `__rebuild(namespace: str | None, faiss_ids: np.ndarray | None = None)`: Rebuilds the index of the namespace from its normalized embeddings, without retraining it.
+    - `__search(queries: np.ndarray, top_k: int, snapshot: _Snapshot) -> Tuple[np.ndarray, np.ndarray]`: Searches the snapshot of a namespace, scanning the normalized embeddings of flat indexes.
+    - `__fast_search(vector: Vector, top_k: int, snapshot: _Snapshot) -> List[Vector]`: Searches the normalized embeddings of the namespace with a fused top-k inner product kernel.
+    - `__publish(namespace: str | None)`: Publishes the current state of the namespace as the snapshot read by `search`.
+    - `__grow(namespace: str | None, size: int, exact: bool = False)`: Grows the normalized embeddings buffer of the namespace, doubling its capacity.
     - `add(vectors: List[Vector], namespace: str | None = None)`: Add vectors to the index.
     - `delete(ids: List[str] | None = None, delete_all: bool | None = None, namespace: str | None = None)`: Delete vectors from the index.
-    - `search(vector: Vector | None = None, id: str | None = None, top_k: int = 1, namespace: str | None = None) -> List[Vector]`: Search for vectors in the index.
-    - `save_local(dir_path: str = ".", namespace: str | None = None, save_all: bool = False)`: Save the index and the local_id objects from the given namespace or from all the namespaces.
-    - `load_local(namespaces: List[str | None], dir_path: str = ".", d: int = 1536)`: Load the index and the local_id objects from the given namespace or from all the namespaces.
+    - `reserve(n: int, namespace: str | None = None)`: Preallocate memory for the normalized embeddings of the namespace.
+    - `compact(namespace: str | None = None)`: Releases the memory the namespace has preallocated for vectors it does not hold.
+    - `set_search_parameters(efSearch: int | None = None, nprobe: int | None = None)`: Sets the search parameters of the HNSW and IVF indexes.
+    - `search(vector: Vector | None = None, id: str | None = None, top_k: int = 1, namespace: str | None = None, fast_mode: bool = False) -> List[Vector]`: Search for vectors in the index.
+    - `search_batch(vectors: List[Vector], top_k: int = 1, namespace: str | None = None) -> List[List[Vector]]`: Search for the closest vectors of each query vector in a single call to the index.
+    - `save_local(dir_path: str = ".", namespace: str | None = None, save_all: bool = False, precision: Literal["fp32", "fp16", "int8"] = "fp32")`: Save the index and the local_id objects from the given namespace or from all the namespaces.
+    - `__dump_vectors(vectors: List[Vector]) -> Dict[str, np.ndarray]`: Converts a list of Vector objects to the arrays saved by `save_local` and `save_firebase_storage`.
+    - `__load_vectors(arrays: Any) -> List[Vector]`: Converts the arrays saved by `save_local` and `save_firebase_storage` back to a list of Vector objects.
+    - `__storage_path(uid: str, file_id: str, file_path: str = "") -> str`: Creates the Firebase Storage folder of the files of a document.
+    - `__blob_names(path: str, namespace: str | None) -> Tuple[str, str]`: Creates the Firebase Storage names of the index and the local_id files of a namespace.
+    - `load_local(namespaces: List[str | None], dir_path: str = ".", d: int = 1536, legacy_pickle: bool = True, index_factory: str = "Flat", quantization: Literal["fp32", "fp16", "int8"] = "fp32")`: Load the index and the local_id objects from the given namespace or from all the namespaces.
     """
 
     @override
@@ -281,8 +908,12 @@ class FAISSVectorStore(VectorStore):
         local_id: Dict[str | None, List[Vector]] = None,
         index: Dict[str | None, Any] = None,
         d: int = 1536,
+        index_factory: str = "Flat",
+        quantization: Literal["fp32", "fp16", "int8"] = "fp32",
+        cache_size: int = 0,
+        cache_threshold: float = 0.97,
+        gpu: bool = False,
     ):
-        print(firebase_admin._apps)
         """
         Initialize a FAISSVectorStore object to manage vectors in a FAISS index.
 
@@ -290,22 +921,77 @@ class FAISSVectorStore(VectorStore):
             `local_id` (Dict[str | None, List[Vector]], optional): A dictionary with the list of Vector objects of each namespace.
             `index` (Dict[str | None, Any], optional): A dictionary with the FAISS index of each namespace.
             `d` (int, optional): The dimension of the Vector embeddings to be stored. Must coincide with the embeddings model used. The default is 1536.
+            `index_factory` (str, optional): The FAISS index factory string used to build new indexes, e.g. `"HNSW32"` or `"IVF1024,PQ192"`. The default is `"Flat"`.
+            `quantization` (Literal["fp32", "fp16", "int8"], optional): The precision used to store the embeddings of flat indexes and of the normalized embeddings kept in memory. `"fp16"` and `"int8"` use 2x and 4x less memory at a small cost in accuracy. The default is `"fp32"`.
+            `cache_size` (int, optional): The number of query vectors whose results are cached for each namespace and `top_k`. If 0, the cache is disabled. The default is 0.
+            `cache_threshold` (float, optional): The minimum cosine similarity between two query vectors to reuse cached results. The default is 0.97.
+            `gpu` (bool, optional): If set to `True`, searches run on a copy of each index in all the available GPUs. Requires `faiss-gpu`; otherwise a warning is raised and the CPU is used. The default is `False`.
 
         Raises:
             ValueError: If the user provides only one of the arguments.
+            ValueError: If `quantization` is not valid.
 
         Note:
             The `None` key in both arguments refers to the general namespace.
+            Indexes that require training (IVF, PQ, ...) use a flat index until the namespace holds enough vectors to train them.
+            Searches never wait for `add` or `delete`: writers publish the namespace once they are done. Flat indexes are updated in place, while the rest are copied on each write.
+            With `gpu`, the indexes are still updated and saved on the CPU, and copied to the GPUs every time they change. Large flat namespaces benefit the most, since their search is bound by memory bandwidth.
         """
+        if quantization not in ("fp32", "fp16", "int8"):
+            raise ValueError(
+                f"`quantization` must be one of 'fp32', 'fp16' or 'int8', got {quantization}."
+            )
+
+        self.__index_factory = index_factory
+        self.__quantization = quantization
+        self.__search_parameters: Dict[str, int] = dict()
+        self.__query_cache = (
+            _QueryCache(cache_size, cache_threshold) if cache_size > 0 else None
+        )
+
+        if gpu and get_num_gpus() == 0:
+            warnings.warn(
+                "No GPU available for FAISS (is faiss-gpu installed?), searching on the CPU."
+            )
+            gpu = False
+        self.__gpu = gpu
+
+        probe = index_factory_(d, index_factory, METRIC_INNER_PRODUCT)
+        self.__index_type = type(probe)
+        self.__train_size = 0 if probe.is_trained else self.__min_train_size(probe)
+
         if local_id and index:
             self.__local_id: Dict[str | None, List[Vector]] = local_id
             self.__index: Dict[str | None, Any] = index
         elif local_id is None and index is None:
             self.__local_id: Dict[str | None, List[Vector]] = {None: []}
-            self.__index: Dict[str | None, Any] = {None: IndexFlatIP(d)}
+            self.__index: Dict[str | None, Any] = {None: self.__new_index(d)}
         else:
             raise ValueError("You must provide both `local_id` and `index` or neither.")
 
+        for namespace, vectors in self.__local_id.items():
+            if not isinstance(self.__index[namespace], IndexIDMap2):
+                self.__index[namespace] = self.__with_ids(
+                    self.__index[namespace], vectors
+                )
+
+        self.__id_to_pos: Dict[str | None, Dict[int, int]] = {
+            namespace: self.__build_id_to_pos(vectors)
+            for namespace, vectors in self.__local_id.items()
+        }
+        self.__norm_buffer: Dict[str | None, np.ndarray] = {
+            namespace: self.__to_storage(
+                self.__normalize(vectors, self.__index[namespace].d)
+            )
+            for namespace, vectors in self.__local_id.items()
+        }
+        self.__norm_matrix: Dict[str | None, np.ndarray] = dict(self.__norm_buffer)
+
+        self.__lock = threading.Lock()
+        self.__snapshots: Dict[str | None, _Snapshot] = dict()
+        for namespace in self.__local_id.keys():
+            self.__publish(namespace)
+
     @property
     def local_id(self):
         """A dictionary with the list of Vector objects of each namespace."""
@@ -316,6 +1002,273 @@ class FAISSVectorStore(VectorStore):
         """A dictionary with the index of each namespace."""
         return self.__index
 
+    @property
+    def index_factory(self) -> str:
+        """The FAISS index factory string used to build the index of each namespace."""
+        return self.__index_factory
+
+    @property
+    def quantization(self) -> Literal["fp32", "fp16", "int8"]:
+        """The precision used to store the embeddings of flat indexes."""
+        return self.__quantization
+
+    @property
+    def gpu(self) -> bool:
+        """Whether the searches run on the GPUs."""
+        return self.__gpu
+
+    def __to_storage(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Converts normalized float32 embeddings to the precision set by `quantization`.
+
+        Args:
+            `matrix` (np.ndarray): The normalized float32 embeddings.
+
+        Returns:
+            `matrix` (np.ndarray): The embeddings as float32, float16 or int8 (scaled by 127).
+        """
+        if self.__quantization == "fp16":
+            return matrix.astype(np.float16)
+        if self.__quantization == "int8":
+            return np.rint(matrix * 127).astype(np.int8)
+        return matrix
+
+    def __from_storage(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Converts stored embeddings back to contiguous float32 embeddings.
+
+        Args:
+            `matrix` (np.ndarray): The embeddings as stored by `__to_storage`.
+
+        Returns:
+            `matrix` (np.ndarray): The float32 embeddings.
+        """
+        if self.__quantization == "int8":
+            return np.ascontiguousarray(matrix, dtype=np.float32) / 127
+        return np.ascontiguousarray(matrix, dtype=np.float32)
+
+    @staticmethod
+    def __to_faiss_id(id: str) -> int:
+        """
+        Creates a stable, non-negative int64 FAISS id from a Vector id.
+
+        Args:
+            `id` (str): The id of the Vector object.
+
+        Returns:
+            `faiss_id` (int): The id used for the Vector object inside the FAISS index.
+        """
+        digest = hashlib.blake2b(id.encode(), digest_size=8).digest()
+
+        return int.from_bytes(digest, "little") & 0x7FFFFFFFFFFFFFFF
+
+    @staticmethod
+    def __min_train_size(index: Any) -> int:
+        """
+        Computes the number of vectors needed to train the given FAISS index.
+
+        Args:
+            `index` (Any): An untrained FAISS index.
+
+        Returns:
+            `size` (int): 39 vectors per IVF centroid, as recommended by FAISS, and at least one vector per PQ centroid.
+        """
+        try:
+            index = extract_index_ivf(index)
+            size = index.nlist * 39
+        except RuntimeError:
+            size = 0
+
+        pq = getattr(downcast_index(index), "pq", None)
+        if pq is not None:
+            size = max(size, 2**pq.nbits)
+
+        return size or 256 * 39
+
+    def __new_flat_index(
+        self, d: int, quantization: Literal["fp32", "fp16", "int8"] | None = None
+    ) -> Any:
+        """
+        Creates an empty flat FAISS index with the precision set by `quantization`.
+
+        Args:
+            `d` (int): The dimension of the Vector embeddings.
+            `quantization` (Literal["fp32", "fp16", "int8"] | None, optional): The precision of the index. The default is the `quantization` of the vector store.
+
+        Returns:
+            `index` (Any): An `IndexFlatIP` for `"fp32"`, or an `IndexScalarQuantizer` for `"fp16"` and `"int8"`.
+        """
+        if quantization is None:
+            quantization = self.__quantization
+
+        if quantization == "fp16":
+            return IndexScalarQuantizer(
+                d, ScalarQuantizer.QT_fp16, METRIC_INNER_PRODUCT
+            )
+        if quantization == "int8":
+            index = IndexScalarQuantizer(
+                d, ScalarQuantizer.QT_8bit, METRIC_INNER_PRODUCT
+            )
+            # Normalized embeddings lie in [-1, 1], so there is no need to train on real data
+            index.train(np.array([[-1.0] * d, [1.0] * d], dtype=np.float32))
+            return index
+        return IndexFlatIP(d)
+
+    def __new_index(
+        self, d: int, training_data: np.ndarray | None = None
+    ) -> IndexIDMap2:
+        """
+        Creates an empty FAISS index using `index_factory` that stores the Vector objects by their FAISS id.
+
+        Args:
+            `d` (int): The dimension of the Vector embeddings.
+            `training_data` (np.ndarray | None, optional): The normalized embeddings used to train the index, if it requires training. The default is `None`.
+
+        Returns:
+            `index` (IndexIDMap2): The index wrapped in an `IndexIDMap2`. If the index requires training and there is not enough `training_data`, a flat index is used instead.
+        """
+        if self.__index_factory == "Flat":
+            return IndexIDMap2(self.__new_flat_index(d))
+
+        index = index_factory_(d, self.__index_factory, METRIC_INNER_PRODUCT)
+
+        if not index.is_trained:
+            if training_data is None or len(training_data) < self.__train_size:
+                return IndexIDMap2(self.__new_flat_index(d))
+            index.train(training_data)
+
+        for name, value in self.__search_parameters.items():
+            self.__set_index_parameter(index, name, value)
+
+        return IndexIDMap2(index)
+
+    @staticmethod
+    def __set_index_parameter(index: Any, name: str, value: int):
+        """
+        Sets a search parameter of the given FAISS index, if the index supports it.
+
+        Args:
+            `index` (Any): The FAISS index.
+            `name` (str): The name of the parameter, e.g. `"efSearch"` or `"nprobe"`.
+            `value` (int): The value of the parameter.
+        """
+        try:
+            ParameterSpace().set_index_parameter(index, name, value)
+        except RuntimeError:
+            pass
+
+    def __rebuild(self, namespace: str | None, faiss_ids: np.ndarray | None = None):
+        """
+        Rebuilds the index of the namespace from its normalized embeddings, reusing its training and search parameters.
+
+        Args:
+            `namespace` (str | None): The namespace whose index is rebuilt.
+            `faiss_ids` (np.ndarray | None, optional): The FAISS ids of the normalized embeddings, in positional order. The default is the ids stored in the current index.
+        """
+        old_index = self.__index[namespace]
+        if faiss_ids is None:
+            faiss_ids = vector_to_array(old_index.id_map)
+
+        embeddings = self.__from_storage(self.__norm_matrix[namespace])
+
+        # Retraining would be slow and would change the results of the vectors that are kept
+        inner_index = clone_index(old_index.index)
+        inner_index.reset()
+        new_index = IndexIDMap2(inner_index)
+        if len(faiss_ids) > 0:
+            new_index.add_with_ids(embeddings, faiss_ids)
+
+        self.__index[namespace] = new_index
+
+    def __quantized_copy(
+        self, namespace: str | None, precision: Literal["fp32", "fp16", "int8"]
+    ) -> Any:
+        """
+        Copies the index of a namespace into a flat index with the given precision. Indexes that are not flat, or that already have the given precision, are returned as they are.
+
+        Args:
+            `namespace` (str | None): The namespace whose index is copied.
+            `precision` (Literal["fp32", "fp16", "int8"]): The precision of the copy.
+
+        Returns:
+            `index` (Any): The index with the given precision.
+        """
+        index = self.__index[namespace]
+        if precision == "fp32" or not isinstance(
+            downcast_index(index.index), IndexFlatIP
+        ):
+            return index
+
+        new_index = IndexIDMap2(self.__new_flat_index(index.d, precision))
+        if index.ntotal > 0:
+            new_index.add_with_ids(
+                self.__from_storage(self.__norm_matrix[namespace]),
+                vector_to_array(index.id_map),
+            )
+
+        return new_index
+
+    @classmethod
+    def __with_ids(cls, index: Any, vectors: List[Vector]) -> IndexIDMap2:
+        """
+        Copies a positional FAISS index into a new index keyed by the FAISS id of each Vector object.
+
+        Args:
+            `index` (Any): The positional FAISS index.
+            `vectors` (List[Vector]): The list of Vector objects stored in the index, in positional order.
+
+        Returns:
+            `index` (IndexIDMap2): The new index.
+        """
+        new_index = IndexIDMap2(IndexFlatIP(index.d))
+
+        if index.ntotal > 0:
+            new_index.add_with_ids(
+                index.reconstruct_n(0, index.ntotal),
+                np.fromiter(
+                    (cls.__to_faiss_id(vector.id) for vector in vectors),
+                    dtype=np.int64,
+                    count=len(vectors),
+                ),
+            )
+
+        return new_index
+
+    @classmethod
+    def __build_id_to_pos(cls, vectors: List[Vector]) -> Dict[int, int]:
+        """
+        Creates a dictionary that maps the FAISS id of each Vector object to its positional id.
+
+        Args:
+            `vectors` (List[Vector]): The list of Vector objects of a namespace.
+
+        Returns:
+            `id_to_pos` (Dict[int, int]): A dictionary with the positional id of each FAISS id.
+        """
+        return {cls.__to_faiss_id(vector.id): i for i, vector in enumerate(vectors)}
+
+    @staticmethod
+    def __normalize(vectors: List[Vector], d: int) -> np.ndarray:
+        """
+        Creates a L2-normalized Numpy matrix with the embeddings of the given Vector objects.
+
+        Args:
+            `vectors` (List[Vector]): The list of Vector objects.
+            `d` (int): The dimension of the Vector embeddings.
+
+        Returns:
+            `matrix` (np.ndarray): A contiguous float32 array of shape `(len(vectors), d)`.
+        """
+        if not vectors:
+            return np.empty((0, d), dtype=np.float32)
+
+        matrix = np.ascontiguousarray(
+            np.array([vector.embeddings for vector in vectors], dtype=np.float32)
+        )
+        normalize_L2(matrix)
+
+        return matrix
+
     def __return_ids(self, ids: List[str], namespace: str | None) -> np.array:
         """
         Creates a Numpy array with the positional ids of the given Vectors ids.
@@ -330,80 +1283,73 @@ class FAISSVectorStore(VectorStore):
         Raises:
             ValueError: If it does not find all the ids.
         """
-        ids_to_return = [
-            i for i, vector in enumerate(self.__local_id[namespace]) if vector.id in ids
-        ]
+        id_to_pos = self.__id_to_pos[namespace]
 
-        if len(ids_to_return) != len(ids):
+        try:
+            return np.fromiter(
+                (id_to_pos[self.__to_faiss_id(id)] for id in ids),
+                dtype=np.int64,
+                count=len(ids),
+            )
+        except KeyError:
             raise ValueError("Did not found all the ids provided.")
 
-        return np.array(ids_to_return)
-
-    def __return_embeddings(self, id: str, namespace: str | None) -> np.array:
+    def __return_embeddings(
+        self, id: str, snapshot: _Snapshot, namespace: str | None
+    ) -> np.array:
         """
-        Creates a Numpy array with the embeddings of the given Vector id.
+        Creates a Numpy array with the normalized embeddings of the given Vector id.
 
         Args:
             `id` (str): The id of the Vector object.
+            `snapshot` (_Snapshot): The snapshot of the namespace.
             `namespace` (str | None): The namespace where the Vector objects are stored.
 
         Returns:
-            `embeddings` (np.array): An array of the embeddings of the Vector object.
+            `embeddings` (np.array): An array of shape `(1, d)` with the normalized embeddings of the Vector object.
 
         Raises:
             ValueError: If it does not find the id.
         """
-        embeddings = None
-
-        for vector in self.__local_id[namespace]:
-            if vector.id == id:
-                embeddings = np.array([vector.embeddings.copy()], dtype=np.float32)
-                normalize_L2(embeddings)
-                break
+        pos = snapshot.id_to_pos.get(self.__to_faiss_id(id))
 
-        if embeddings is None:
+        # Ids added after the snapshot was published are past its `norm_matrix`
+        if pos is None or pos >= len(snapshot.norm_matrix):
             raise ValueError(f"Did not found the id {id} in the namespace {namespace}.")
 
-        return embeddings
+        return self.__from_storage(snapshot.norm_matrix[pos : pos + 1])
 
     def __return_vectors(
-        self, ids: List[int], distance: List[float], namespace: str | None
+        self, positions: np.ndarray, distance: np.ndarray, snapshot: _Snapshot
     ) -> List[Vector]:
         """
-        Updates the score in the metadata of each Vector object, and creates a list of Vector objects given their positional ids.
+        Creates a list of Vector objects given their positional ids, with their score added to a copy of their metadata.
 
         Args:
-            `ids` (List[int]): The positional ids of the Vector objects to return.
-            `distance` (List[float]): The distance score of each Vector object.
-            `namespace` (str | None): The namespace where the Vector objects are stored.
+            `positions` (np.ndarray): The positional ids of the Vector objects to return, as returned by `__search`. Negative ids are skipped.
+            `distance` (np.ndarray): The distance score of each Vector object.
+            `snapshot` (_Snapshot): The snapshot of the namespace.
 
         Returns:
             `vectors_to_return` (List[Vector]): A list of Vector objects.
         """
         vectors_to_return = list()
-        to_update = list()
 
-        for i_, id in enumerate(ids):
-            if id != -1:
-                vector_ = None
-                for i, vector in enumerate(self.__local_id[namespace]):
-                    if id == i:
-                        vector_ = vector
-                        break
+        for i_ in range(len(positions)):
+            position = int(positions[i_])
+            if position < 0:
+                continue
 
-                metadata = vector_.metadata
-                metadata.update({"score": distance[i_]})
+            vector_ = snapshot.local_id[position]
 
-                new_vector = Vector(
-                    embeddings=vector_.embeddings, id=vector_.id, metadata=metadata
+            # The stored Vector is shared with concurrent searches, so it is not modified
+            vectors_to_return.append(
+                Vector(
+                    embeddings=vector_.embeddings,
+                    id=vector_.id,
+                    metadata={**vector_.metadata, "score": float(distance[i_])},
                 )
-
-                vectors_to_return.append(new_vector)
-
-                to_update.append((id, new_vector))
-
-        for i, vector in to_update:
-            self.__local_id[namespace][i] = vector
+            )
 
         return vectors_to_return
 
@@ -412,20 +1358,78 @@ class FAISSVectorStore(VectorStore):
         Removes the given Vector objects from the `local_id` list.
 
         Args:
-            `ids` (List[int]): The positional ids of the Vector objects to return.
+            `ids` (List[str]): The ids of the Vector objects to remove.
             `namespace` (str | None): The namespace where the Vector objects are stored.
 
         Raises:
             ValueError: if it does not find all the ids.
         """
-        new_list = [
-            vector for vector in self.__local_id[namespace] if vector.id not in ids
-        ]
+        id_to_pos = self.__id_to_pos[namespace]
+        vectors = self.__local_id[namespace]
 
-        if len(new_list) != len(ids):
+        try:
+            positions = [id_to_pos[self.__to_faiss_id(id)] for id in set(ids)]
+        except KeyError:
             raise ValueError("Did not found all the ids provided.")
 
-        self.__local_id[namespace] = new_list
+        keep_mask = np.ones(len(vectors), dtype=bool)
+        keep_mask[positions] = False
+
+        self.__local_id[namespace] = [
+            vector for vector, keep in zip(vectors, keep_mask) if keep
+        ]
+
+    def __publish(self, namespace: str | None):
+        """
+        Publishes the current state of the namespace as the snapshot read by `search`.
+        Must be called by writers, while holding the lock, once they are done mutating the namespace.
+
+        Args:
+            `namespace` (str | None): The namespace to publish.
+        """
+        index = self.__index[namespace]
+        inner_index = downcast_index(index.index)
+
+        # Flat indexes are appended in place, so their searches scan the
+        # normalized embeddings, which writers never overwrite, instead
+        searched_index = None if isinstance(inner_index, IndexFlatCodes) else index
+        if self.__gpu:
+            try:
+                searched_index = index_cpu_to_all_gpus(index)
+            except RuntimeError:
+                # Indexes without a GPU implementation (e.g. HNSW) are searched on the CPU
+                pass
+
+        self.__snapshots[namespace] = _Snapshot(
+            index=searched_index,
+            local_id=self.__local_id[namespace],
+            id_to_pos=self.__id_to_pos[namespace],
+            norm_matrix=self.__norm_matrix[namespace],
+            exact=isinstance(inner_index, IndexFlatIP),
+        )
+
+    def __grow(self, namespace: str | None, size: int, exact: bool = False):
+        """
+        Grows the normalized embeddings buffer of the namespace to hold at least `size` vectors, doubling its capacity so that repeated adds reallocate it only a logarithmic number of times.
+
+        Args:
+            `namespace` (str | None): The namespace whose buffer is grown.
+            `size` (int): The number of vectors the buffer must be able to hold.
+            `exact` (bool, optional): If set to `True`, the buffer is grown to exactly `size` vectors instead of doubling its capacity. The default is `False`.
+        """
+        buffer = self.__norm_buffer[namespace]
+        if size <= len(buffer):
+            return
+
+        matrix = self.__norm_matrix[namespace]
+        new_buffer = np.empty(
+            (size if exact else max(2 * len(buffer), size), buffer.shape[1]),
+            dtype=buffer.dtype,
+        )
+        new_buffer[: len(matrix)] = matrix
+
+        self.__norm_buffer[namespace] = new_buffer
+        self.__norm_matrix[namespace] = new_buffer[: len(matrix)]
 
     @override
     def add(
@@ -445,36 +1449,104 @@ class FAISSVectorStore(VectorStore):
             ValueError: if an id is not unique within the given vectors or within the namespace.
             ValueError: if the dimension (d) of any of the vectors is different to the dimension set in the index.
         """
-        if namespace not in self.__local_id.keys():
-            self.__local_id[namespace] = list()
-            self.__index[namespace] = IndexFlatIP(len(vectors[0].embeddings))
+        with self.__lock:
+            # Nothing is modified until the new vectors are validated and the
+            # index is updated, so a failed add leaves the namespace untouched
+            old_index = self.__index.get(namespace)
+            if old_index is not None:
+                d = old_index.d
+                local_id = self.__local_id[namespace]
+                id_to_pos = self.__id_to_pos[namespace]
+            else:
+                d = len(vectors[0].embeddings)
+                local_id = list()
+                id_to_pos = dict()
 
-        ids = [vector.id for vector in self.__local_id[namespace]]
-        ids_vector = list()
+            ids_vector = dict()
 
-        for vector in vectors:
-            if vector.id in ids or vector.id in ids_vector:
-                raise ValueError(
-                    f"The id {vector.id} is duplicated. The ids must be unique."
-                )
-            ids_vector.append(vector.id)
+            for vector in vectors:
+                faiss_id = self.__to_faiss_id(vector.id)
+                if faiss_id in id_to_pos or faiss_id in ids_vector:
+                    raise ValueError(
+                        f"The id {vector.id} is duplicated. The ids must be unique."
+                    )
+                ids_vector[faiss_id] = len(ids_vector)
 
-            if len(vector.embeddings) != self.__index[namespace].d:
-                raise ValueError(
-                    f"Vectors must be size {self.__index[namespace].d} but got size {len(vector.embeddings)} instead."
-                )
+                if len(vector.embeddings) != d:
+                    raise ValueError(
+                        f"Vectors must be size {d} but got size {len(vector.embeddings)} instead."
+                    )
 
-        data_to_add = list()
+            data_to_add = self.__normalize(vectors, d)
 
-        for vector in vectors:
-            vector_to_add = np.array([vector.embeddings.copy()], dtype=np.float32)
-            normalize_L2(vector_to_add)
+            faiss_ids = np.fromiter(
+                ids_vector.keys(), dtype=np.int64, count=len(ids_vector)
+            )
+
+            if (
+                self.__train_size
+                and len(local_id) + len(vectors) >= self.__train_size
+                and not (
+                    old_index is not None
+                    and isinstance(downcast_index(old_index.index), self.__index_type)
+                )
+            ):
+                # The namespace holds enough vectors to train the index
+                embeddings, all_ids = data_to_add, faiss_ids
+                if old_index is not None:
+                    embeddings = np.concatenate(
+                        (self.__from_storage(self.__norm_matrix[namespace]), embeddings)
+                    )
+                    all_ids = np.concatenate(
+                        (vector_to_array(old_index.id_map), faiss_ids)
+                    )
+                index = self.__new_index(d, embeddings)
+                index.add_with_ids(embeddings, all_ids)
+            else:
+                if old_index is None:
+                    index = self.__new_index(d)
+                elif isinstance(downcast_index(old_index.index), IndexFlatCodes):
+                    # Searches do not read flat indexes (see `__publish`), so they are updated in place
+                    index = old_index
+                else:
+                    # The published index is read by concurrent searches, so the new
+                    # vectors are added to a copy
+                    index = clone_index(old_index)
+                index.add_with_ids(data_to_add, faiss_ids)
+
+            if old_index is None:
+                self.__norm_buffer[namespace] = self.__to_storage(
+                    np.empty((0, d), dtype=np.float32)
+                )
+                self.__norm_matrix[namespace] = self.__norm_buffer[namespace]
+
+            # Rows past the published view are not read by searches, so the
+            # buffer can be written in place
+            size = len(self.__norm_matrix[namespace])
+            self.__grow(namespace, size + len(vectors))
+            np.copyto(
+                self.__norm_buffer[namespace][size : size + len(vectors)],
+                self.__to_storage(data_to_add),
+            )
+            self.__norm_matrix[namespace] = self.__norm_buffer[namespace][
+                : size + len(vectors)
+            ]
 
-            data_to_add.append(vector_to_add[0])
+            # Published snapshots share these containers, but only read the
+            # positions below the size of their `norm_matrix`
+            start = len(local_id)
+            for faiss_id, i in ids_vector.items():
+                id_to_pos[faiss_id] = start + i
+            local_id.extend(vectors)
 
-        self.__index[namespace].add(x=np.array(data_to_add))
+            self.__index[namespace] = index
+            self.__id_to_pos[namespace] = id_to_pos
+            self.__local_id[namespace] = local_id
 
-        self.__local_id[namespace] += vectors
+            self.__publish(namespace)
+
+            if self.__query_cache is not None:
+                self.__query_cache.clear()
 
     @override
     def delete(
@@ -498,19 +1570,187 @@ class FAISSVectorStore(VectorStore):
         Note:
             You must provide either `ids` or `delete_all`. And if both are given `ids` has the priority.
         """
-        if namespace not in self.__local_id.keys():
-            raise ValueError(f"The namespace {namespace} does not exist.")
-
-        if ids is not None:
-            ids_to_delete = self.__return_ids(ids=ids, namespace=namespace)
-            self.__index[namespace].remove_ids(x=ids_to_delete)
-            self.__remove_ids(ids=ids, namespace=namespace)
-        elif delete_all:
-            self.__index[namespace].reset()
-            self.__local_id[namespace].clear()
-        else:
+        if ids is None and not delete_all:
             raise ValueError("You must provide either `ids` or `delete_all=True`")
 
+        with self.__lock:
+            if namespace not in self.__local_id.keys():
+                raise ValueError(f"The namespace {namespace} does not exist.")
+
+            if self.__query_cache is not None:
+                self.__query_cache.clear()
+
+            if ids is not None:
+                ids_to_delete = self.__return_ids(ids=ids, namespace=namespace)
+                self.__norm_matrix[namespace] = np.delete(
+                    self.__norm_matrix[namespace], ids_to_delete, axis=0
+                )
+                self.__norm_buffer[namespace] = self.__norm_matrix[namespace]
+                if isinstance(
+                    downcast_index(self.__index[namespace].index), IndexFlatCodes
+                ):
+                    self.__index[namespace].remove_ids(
+                        np.fromiter(
+                            (self.__to_faiss_id(id) for id in ids),
+                            dtype=np.int64,
+                            count=len(ids),
+                        )
+                    )
+                else:
+                    # IndexIDMap2 expects the removed rows to be renumbered, which only
+                    # flat indexes do. The rest (IVF, HNSW, ...) are rebuilt instead
+                    self.__rebuild(
+                        namespace,
+                        np.delete(
+                            vector_to_array(self.__index[namespace].id_map),
+                            ids_to_delete,
+                        ),
+                    )
+                self.__remove_ids(ids=ids, namespace=namespace)
+                self.__id_to_pos[namespace] = self.__build_id_to_pos(
+                    self.__local_id[namespace]
+                )
+            else:
+                self.__index[namespace] = self.__new_index(self.__index[namespace].d)
+                self.__local_id[namespace] = list()
+                self.__id_to_pos[namespace] = dict()
+                self.__norm_buffer[namespace] = self.__norm_buffer[namespace][:0].copy()
+                self.__norm_matrix[namespace] = self.__norm_buffer[namespace]
+
+            self.__publish(namespace)
+
+    def reserve(self, n: int, namespace: str | None = None):
+        """
+        Preallocates memory for the normalized embeddings of `n` vectors in the namespace, avoiding reallocations when the final size is known in advance.
+
+        Args:
+            `n` (int): The total number of vectors the namespace is expected to hold.
+            `namespace` (str | None, optional): The namespace where the memory is preallocated. The default is `None`.
+
+        Raises:
+            ValueError: if the namespace does not exist.
+        """
+        with self.__lock:
+            if namespace not in self.__local_id.keys():
+                raise ValueError(f"The namespace {namespace} does not exist.")
+
+            self.__grow(namespace, n, exact=True)
+            self.__publish(namespace)
+
+    def compact(self, namespace: str | None = None):
+        """
+        Releases the memory the namespace has preallocated for vectors it does not hold, e.g. after deleting many vectors or calling `reserve`.
+
+        Args:
+            `namespace` (str | None, optional): The namespace that is compacted. The default is `None`.
+
+        Raises:
+            ValueError: if the namespace does not exist.
+        """
+        with self.__lock:
+            if namespace not in self.__local_id.keys():
+                raise ValueError(f"The namespace {namespace} does not exist.")
+
+            # Copies are allocated with the exact size of their contents
+            self.__index[namespace] = clone_index(self.__index[namespace])
+            self.__norm_buffer[namespace] = self.__norm_matrix[namespace].copy()
+            self.__norm_matrix[namespace] = self.__norm_buffer[namespace]
+            self.__publish(namespace)
+
+        if _libc is not None:
+            _libc.malloc_trim(0)
+
+    def set_search_parameters(
+        self, efSearch: int | None = None, nprobe: int | None = None
+    ):
+        """
+        Sets the search parameters of the indexes of all the namespaces, including the ones created afterwards.
+        Higher values improve the recall at the cost of a slower search.
+
+        Args:
+            `efSearch` (int | None, optional): The size of the candidate list explored by HNSW indexes. The default is `None`.
+            `nprobe` (int | None, optional): The number of inverted lists visited by IVF indexes. The default is `None`.
+
+        Note:
+            Parameters that do not apply to an index (e.g. `nprobe` on an HNSW index) are ignored.
+        """
+        with self.__lock:
+            if efSearch is not None:
+                self.__search_parameters["efSearch"] = efSearch
+            if nprobe is not None:
+                self.__search_parameters["nprobe"] = nprobe
+
+            for namespace, index in self.__index.items():
+                for name, value in self.__search_parameters.items():
+                    self.__set_index_parameter(index.index, name, value)
+                self.__publish(namespace)
+
+    def __search(
+        self, queries: np.ndarray, top_k: int, snapshot: _Snapshot
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Searches the snapshot of a namespace with the given normalized query embeddings.
+
+        Args:
+            `queries` (np.ndarray): A contiguous float32 array of shape `(n, d)` with the normalized query embeddings.
+            `top_k` (int): The number of top Vector objects to be returned for each query.
+            `snapshot` (_Snapshot): The snapshot of the namespace.
+
+        Returns:
+            `distance` (np.ndarray): The distance score of the top Vector objects of each query.
+            `positions` (np.ndarray): The positional ids of the top Vector objects of each query, -1 where there are fewer than `top_k`.
+        """
+        if snapshot.index is not None:
+            distance, ids = snapshot.index.search(x=queries, k=top_k)
+            id_to_pos = snapshot.id_to_pos
+            positions = np.array(
+                [
+                    [id_to_pos[id] if id >= 0 else -1 for id in row]
+                    for row in ids.tolist()
+                ],
+                dtype=np.int64,
+            ).reshape(ids.shape)
+            return distance, positions
+
+        matrix = snapshot.norm_matrix
+        top_k = min(top_k, len(matrix))
+        if matrix.dtype == np.float32:
+            return knn(queries, matrix, top_k, metric=METRIC_INNER_PRODUCT)
+
+        heap = ResultHeap(len(queries), top_k, keep_max=True)
+        for start in range(0, len(matrix), _DECODE_ROWS):
+            block = self.__from_storage(matrix[start : start + _DECODE_ROWS])
+            distance, positions = knn(
+                queries, block, min(top_k, len(block)), metric=METRIC_INNER_PRODUCT
+            )
+            heap.add_result(distance, positions + start)
+        heap.finalize()
+
+        return heap.D, heap.I
+
+    def __fast_search(
+        self, vector: Vector, top_k: int, snapshot: _Snapshot
+    ) -> List[Vector]:
+        """
+        Searches the normalized embeddings of the namespace with `_topk_ip` instead of the FAISS index.
+
+        Args:
+            `vector` (Vector): The Vector object to be compared to.
+            `top_k` (int): The number of top Vector objects to be returned.
+            `snapshot` (_Snapshot): The snapshot of the namespace.
+
+        Returns:
+            `vectors` (List[Vector]): The list of top Vector objects.
+        """
+        matrix = self.__from_storage(snapshot.norm_matrix)
+        query = np.ascontiguousarray(vector.embeddings, dtype=np.float32)
+
+        distance, positions = _topk_ip(matrix, query, min(top_k, len(matrix)))
+
+        return self.__return_vectors(
+            positions=positions, distance=distance, snapshot=snapshot
+        )
+
     @override
     def search(
         self,
@@ -518,6 +1758,7 @@ class FAISSVectorStore(VectorStore):
         id: str | None = None,
         top_k: int = 1,
         namespace: str | None = None,
+        fast_mode: bool = False,
         **kwargs,
     ) -> List[Vector]:
         """
@@ -528,6 +1769,7 @@ class FAISSVectorStore(VectorStore):
             `id` (str | None, optional): The id of the Vector object to be compared to. The default is `None`.
             `top_k` (int, optional): The number of top Vector objects to be returned. The default is 1.
             `namespace` (str | None, optional): The namespace of the index that is going to be used. The default is `None`.
+            `fast_mode` (bool, optional): If `True` and the namespace uses an exact fp32 index, `vector` searches scan the normalized embeddings with a fused numba kernel (or NumPy when numba is not installed) instead of the FAISS index. The default is `False`.
 
         Returns:
             `vectors`(List[Vector]): The list of top Vector objects.
@@ -542,28 +1784,49 @@ class FAISSVectorStore(VectorStore):
         if "namespace" in kwargs:
             namespace = kwargs["namespace"]
 
-        if namespace not in self.__local_id.keys():
+        snapshot = self.__snapshots.get(namespace)
+
+        if snapshot is None:
             return []
 
-        if self.__index[namespace].ntotal > 0:
+        if len(snapshot.norm_matrix) > 0:
             if vector:
-                vector_to_search = np.array(
-                    [vector.embeddings.copy()], dtype=np.float32
-                )
-                normalize_L2(vector_to_search)
+                if self.__query_cache is not None:
+                    cached = self.__query_cache.get(
+                        (namespace, top_k), vector.embeddings
+                    )
+                    if cached is not None:
+                        return cached
 
-                D, I = self.__index[namespace].search(x=vector_to_search, k=top_k)
+                if fast_mode and snapshot.exact:
+                    vectors = self.__fast_search(
+                        vector=vector, top_k=top_k, snapshot=snapshot
+                    )
+                else:
+                    vector_to_search = np.array(
+                        [vector.embeddings.copy()], dtype=np.float32
+                    )
+                    normalize_L2(vector_to_search)
 
-                vectors = self.__return_vectors(
-                    ids=I.tolist()[0], distance=D.tolist()[0], namespace=namespace
-                )
+                    D, I = self.__search(vector_to_search, top_k, snapshot)
+
+                    vectors = self.__return_vectors(
+                        positions=I[0], distance=D[0], snapshot=snapshot
+                    )
+
+                if self.__query_cache is not None:
+                    self.__query_cache.put(
+                        (namespace, top_k), vector.embeddings, vectors
+                    )
             elif id:
-                id_to_search = self.__return_embeddings(ids=[id], namespace=namespace)
+                id_to_search = self.__return_embeddings(
+                    id=id, snapshot=snapshot, namespace=namespace
+                )
 
-                D, I = self.__index[namespace].search(x=id_to_search, k=top_k)
+                D, I = self.__search(id_to_search, top_k, snapshot)
 
                 vectors = self.__return_vectors(
-                    ids=I.tolist()[0], distance=D.tolist()[0], namespace=namespace
+                    positions=I[0], distance=D[0], snapshot=snapshot
                 )
             else:
                 raise ValueError("You must provide either `vector` or `id`.")
@@ -572,11 +1835,47 @@ class FAISSVectorStore(VectorStore):
 
         return vectors
 
+    def search_batch(
+        self,
+        vectors: List[Vector],
+        top_k: int = 1,
+        namespace: str | None = None,
+        **kwargs,
+    ) -> List[List[Vector]]:
+        """
+        Searches for the top `top_k` closest Vector objects to each of the given Vector objects.
+        All the queries are searched in a single call to the index, which spreads them over all the cores.
+
+        Args:
+            `vectors` (List[Vector]): The Vector objects to be compared to.
+            `top_k` (int, optional): The number of top Vector objects to be returned for each query. The default is 1.
+            `namespace` (str | None, optional): The namespace of the index that is going to be used. The default is `None`.
+
+        Returns:
+            `results` (List[List[Vector]]): The list of top Vector objects of each query, in the same order as `vectors`.
+        """
+        snapshot = self.__snapshots.get(namespace)
+
+        if snapshot is None or len(snapshot.norm_matrix) == 0:
+            return [[] for _ in vectors]
+
+        vectors_to_search = self.__normalize(vectors, snapshot.norm_matrix.shape[1])
+
+        D, I = self.__search(vectors_to_search, top_k, snapshot)
+
+        return [
+            self.__return_vectors(
+                positions=positions, distance=distance, snapshot=snapshot
+            )
+            for positions, distance in zip(I, D)
+        ]
+
     def save_local(
         self,
         dir_path: str = ".",
         namespace: str | None = None,
         save_all: bool = False,
+        precision: Literal["fp32", "fp16", "int8"] = "fp32",
     ):
         """
         Saves both the index and the local_id objects from the given namespace or from all the namespaces.
@@ -587,54 +1886,81 @@ class FAISSVectorStore(VectorStore):
             `dir_path` (str, optional): The path to which all the files will be saved. The default is the current directory.
             `namespace` (str | None, optional): The namespace that will be saved. The default is `None`.
             `save_all` (bool, optional): If set to `True`, all the namespaces will be saved. The default is `False`.
+            `precision` (Literal["fp32", "fp16", "int8"], optional): The precision of the saved flat indexes. `"fp16"` and `"int8"` make the files 2x and 4x smaller at a small cost in accuracy. The default is `"fp32"`.
 
         Raises:
-            ValueError: if the namespace does not exist.
+            ValueError: if the namespace does not exist or if `precision` is not valid.
 
         Note:
             You must provide either `namespace` or `save_all`. If both are given `save_all` has the priority.
+            The index is saved in a `.faiss` file and the local_id objects in a `.npz` file, with the embeddings as an array and the ids and metadata as JSON.
         """
+        if precision not in ("fp32", "fp16", "int8"):
+            raise ValueError(
+                f"`precision` must be one of 'fp32', 'fp16' or 'int8', got {precision}."
+            )
+
         path = Path(dir_path)
         path.mkdir(exist_ok=True, parents=True)
 
         if save_all:
-            for namespace_ in self.__index.keys():
-                write_index(
-                    self.__index[namespace_],
-                    os.path.join(
-                        path,
-                        f"{'index' if namespace_ is None else namespace_ + '_index'}.faiss",
-                    ),
-                )
-
-                with open(
-                    os.path.join(
-                        path,
-                        f"{'index' if namespace_ is None else namespace_ + '_index'}.pkl",
-                    ),
-                    "wb",
-                ) as f:
-                    pickle.dump(self.__local_id[namespace_], f)
+            namespaces = list(self.__index.keys())
         else:
             if namespace not in self.__local_id.keys():
                 raise ValueError(f"The namespace `{namespace}` does not exist.")
+            namespaces = [namespace]
 
-            write_index(
-                self.__index[namespace],
-                os.path.join(
-                    path,
-                    f"{'index' if namespace is None else namespace_ + '_index'}.faiss",
-                ),
-            )
+        # Flat indexes and the local_id lists are updated in place by `add`
+        with self.__lock:
+            for namespace_ in namespaces:
+                name = "index" if namespace_ is None else namespace_ + "_index"
 
-            with open(
-                os.path.join(
-                    path,
-                    f"{'index' if namespace is None else namespace + '_index'}.pkl",
-                ),
-                "wb",
-            ) as f:
-                pickle.dump(self.__local_id[namespace], f)
+                write_index(
+                    self.__quantized_copy(namespace_, precision),
+                    str(path / f"{name}.faiss"),
+                )
+                np.savez_compressed(
+                    path / f"{name}.npz",
+                    **self.__dump_vectors(self.__local_id[namespace_]),
+                )
+
+    @staticmethod
+    def __dump_vectors(vectors: List[Vector]) -> Dict[str, np.ndarray]:
+        """
+        Converts a list of Vector objects to the arrays saved by `save_local` and `save_firebase_storage`.
+
+        Args:
+            `vectors` (List[Vector]): The list of Vector objects.
+
+        Returns:
+            `arrays` (Dict[str, np.ndarray]): The embeddings matrix and the ids and metadata as JSON.
+        """
+        return {
+            "embeddings": np.array([vector.embeddings for vector in vectors]),
+            "ids": np.array(json.dumps([vector.id for vector in vectors])),
+            "metadata": np.array(json.dumps([vector.metadata for vector in vectors])),
+        }
+
+    @staticmethod
+    def __load_vectors(arrays: Any) -> List[Vector]:
+        """
+        Converts the arrays saved by `save_local` and `save_firebase_storage` back to a list of Vector objects.
+
+        Args:
+            `arrays` (Any): The arrays loaded from the `.npz` file.
+
+        Returns:
+            `vectors` (List[Vector]): The list of Vector objects.
+        """
+        ids = json.loads(str(arrays["ids"]))
+        metadata = json.loads(str(arrays["metadata"]))
+
+        return [
+            Vector(embeddings=embeddings, id=id, metadata=metadata_)
+            for embeddings, id, metadata_ in zip(
+                arrays["embeddings"].tolist(), ids, metadata
+            )
+        ]
 
     @classmethod
     def load_local(
@@ -642,6 +1968,9 @@ class FAISSVectorStore(VectorStore):
         namespaces: List[str | None],
         dir_path: str = ".",
         d: int = 1536,
+        legacy_pickle: bool = True,
+        index_factory: str = "Flat",
+        quantization: Literal["fp32", "fp16", "int8"] = "fp32",
     ):
         """
         Creates a FAISSVectorStore from a list of `namespaces` stored in the `dir_path`.
@@ -650,15 +1979,18 @@ class FAISSVectorStore(VectorStore):
             `namespaces` (List[str | None]): The namespaces that will be retrieved.
             `dir_path` (str, optional): The path to which all the files will be retrieved. The default is the current directory.
             `d` (int, optional): The dimension of the Vector embeddings to be stored. Must coincide with the embeddings model used. The default is 1536.
+            `legacy_pickle` (bool, optional): If set to `True`, the local_id objects of namespaces saved by older versions are loaded from their `.pkl` file. Only enable it for trusted files. The default is `True`.
+            `index_factory` (str, optional): The FAISS index factory string used to build new indexes, e.g. `"IVF256,PQ96x8"`. It should match the one used by the saved vector store. The default is `"Flat"`.
+            `quantization` (Literal["fp32", "fp16", "int8"], optional): The precision used to store the embeddings of new flat indexes and of the normalized embeddings kept in memory. The default is `"fp32"`.
 
         Raises:
             ValueError: if the given directory does not exist.
-            ValueError: if something goes wrong with the files.
+            ValueError: if `quantization` is not valid.
 
         Note:
             If you want to load the default index, include `None` in the list.
-            Only if both the `.faiss` and `.pkl` files are found, the namespace is stored.
-            If a namespace raises an error, it will be passed.
+            Only if both the `.faiss` and `.npz` (or legacy `.pkl`) files are found, the namespace is stored.
+            If the files of a namespace cannot be loaded, a warning is logged and the namespace is skipped.
         """
         path = Path(dir_path)
 
@@ -670,33 +2002,71 @@ class FAISSVectorStore(VectorStore):
 
         for namespace in namespaces:
             try:
-                index = read_index(
-                    str(
-                        path
-                        / f"{'index' if namespace is None else namespace + '_index'}.faiss"
-                    )
-                )
+                name = "index" if namespace is None else namespace + "_index"
+
+                index = read_index(str(path / f"{name}.faiss"))
 
-                with open(
-                    path
-                    / f"{'index' if namespace is None else namespace + '_index'}.pkl",
-                    "rb",
-                ) as f:
-                    ids = pickle.load(f)
+                if legacy_pickle and not os.path.isfile(path / f"{name}.npz"):
+                    # Namespaces saved by older versions were pickled
+                    with open(path / f"{name}.pkl", "rb") as f:
+                        ids = pickle.load(f)
+                else:
+                    with np.load(path / f"{name}.npz") as arrays:
+                        ids = cls.__load_vectors(arrays)
 
                 index_[namespace] = index
                 local_id_[namespace] = ids
             except Exception as e:
-                raise RuntimeError(
-                    f"Something wrong happend with the file(s) for the namespace `{namespace}`"
+                logger.warning(
+                    "Skipping the namespace %r, its files could not be loaded: %s",
+                    namespace,
+                    e,
                 )
 
         if None not in index_.keys():
-            index_[None] = []
-            local_id_[None] = IndexFlatIP(d)
-
-        return cls(local_id_, index_)
+            index_[None] = IndexIDMap2(IndexFlatIP(d))
+            local_id_[None] = []
+
+        return cls(
+            local_id_,
+            index_,
+            d=d,
+            index_factory=index_factory,
+            quantization=quantization,
+        )
     
+    @staticmethod
+    def __storage_path(uid: str, file_id: str, file_path: str = "") -> str:
+        """
+        Creates the Firebase Storage folder of the files of a document.
+
+        Args:
+            `uid` (str): The id of the user.
+            `file_id` (str): The id of the document.
+            `file_path` (str, optional): The folder of the document. The default is the root folder of the user.
+
+        Returns:
+            `path` (str): The Firebase Storage folder.
+        """
+        if file_path == "":
+            return f"files/{uid}/documents/{file_id}"
+        return f"files/{uid}/documents/{file_path}/{file_id}"
+
+    @staticmethod
+    def __blob_names(path: str, namespace: str | None) -> Tuple[str, str]:
+        """
+        Creates the Firebase Storage names of the index and the local_id files of a namespace.
+
+        Args:
+            `path` (str): The Firebase Storage folder.
+            `namespace` (str | None): The namespace.
+
+        Returns:
+            `names` (Tuple[str, str]): The names of the index and the local_id files.
+        """
+        suffix = "" if namespace is None else f"_{namespace}"
+        return f"{path}/index{suffix}.pkl", f"{path}/local_id{suffix}.pkl"
+
     def save_firebase_storage(
         self,
         uid: str,
@@ -704,6 +2074,7 @@ class FAISSVectorStore(VectorStore):
         file_path: str = "",
         namespace: str | None = None,
         save_all: bool = False,
+        precision: Literal["fp32", "fp16", "int8"] = "fp32",
     ):
         """
         Saves both the index and the local_id objects from the given namespace or from all the namespaces.
@@ -714,44 +2085,62 @@ class FAISSVectorStore(VectorStore):
             `dir_path` (str, optional): The path to which all the files will be saved. The default is the current directory.
             `namespace` (str | None, optional): The namespace that will be saved. The default is `None`.
             `save_all` (bool, optional): If set to `True`, all the namespaces will be saved. The default is `False`.
+            `precision` (Literal["fp32", "fp16", "int8"], optional): The precision of the uploaded flat indexes. `"fp16"` and `"int8"` make the uploads 2x and 4x smaller at a small cost in accuracy. The default is `"fp32"`.
 
         Raises:
-            ValueError: if the namespace does not exist.
+            ValueError: if the namespace does not exist or if `precision` is not valid.
 
         Note:
             You must provide either `namespace` or `save_all`. If both are given `save_all` has the priority.
         """
+        if precision not in ("fp32", "fp16", "int8"):
+            raise ValueError(
+                f"`precision` must be one of 'fp32', 'fp16' or 'int8', got {precision}."
+            )
+
         bucket = storage.bucket()
 
-        if file_path == "":
-            path = f"files/{uid}/documents/{file_id}"
-        else :
-            path = f"files/{uid}/documents/{file_path}/{file_id}" 
+        path = self.__storage_path(uid, file_id, file_path)
 
         if save_all:
-            for namespace_ in self.__index.keys():
-
-                chunk = serialize_index(self.__index[namespace_])
-                pickled_index = pickle.dumps(chunk)
-                index_blob = bucket.blob(f"{path}/{'index.pkl' if namespace_ is None else 'index_' + namespace_ + '.pkl'}")
-                index_blob.upload_from_string(pickled_index, "application/octet-stream")
-
-                pickled_local_id = pickle.dumps(self.__local_id[namespace_])
-                local_id_blob = bucket.blob(f"{path}/{'local_id.pkl' if namespace_ is None else 'local_id_' + namespace_ + '.pkl'}")
-                local_id_blob.upload_from_string(pickled_local_id, "application/octet-stream")
-
+            namespaces = list(self.__index.keys())
         else:
             if namespace not in self.__local_id.keys():
                 raise ValueError(f"The namespace `{namespace}` does not exist.")
+            namespaces = [namespace]
+
+        # The files are compressed while they are written, and large ones are spilled to disk
+        uploads: List[Tuple[str, IO[bytes]]] = list()
+        # Flat indexes and the local_id lists are updated in place by `add`
+        with self.__lock:
+            for namespace_ in namespaces:
+                index_name, local_id_name = self.__blob_names(path, namespace_)
+
+                index_file = tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE)
+                with _CompressedWriter(index_file) as writer:
+                    writer.write(
+                        serialize_index(self.__quantized_copy(namespace_, precision))
+                    )
+                uploads.append((index_name, index_file))
 
-            chunk = serialize_index(self.__index[namespace])
-            pickled_index = pickle.dumps(chunk)
-            index_blob = bucket.blob(f"{path}/{'index.pkl' if namespace is None else 'index_' + namespace + '.pkl'}")
-            index_blob.upload_from_string(pickled_index, "application/octet-stream")
+                # The local_id objects are saved in the same `.npz` format as `save_local`
+                local_id_file = tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE)
+                np.savez_compressed(
+                    local_id_file, **self.__dump_vectors(self.__local_id[namespace_])
+                )
+                uploads.append((local_id_name, local_id_file))
+
+        def upload(blob_name: str, file: IO[bytes]):
+            blob = bucket.blob(blob_name)
+            blob.chunk_size = _CHUNK_SIZE
+            with file:
+                blob.upload_from_file(
+                    file, rewind=True, content_type="application/octet-stream"
+                )
 
-            pickled_local_id = pickle.dumps(self.__local_id[namespace])
-            local_id_blob = bucket.blob(f"{path}/{'local_id.pkl' if namespace is None else 'local_id_' + namespace + '.pkl'}")
-            local_id_blob.upload_from_string(pickled_local_id, "application/octet-stream")
+        # The uploads are bound by the network latency, so they are sent concurrently
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(lambda upload_: upload(*upload_), uploads))
 
     @classmethod
     def load_firebase_storage(
@@ -761,6 +2150,8 @@ class FAISSVectorStore(VectorStore):
         namespaces: List[str | None] = [None],
         file_path: str = "",
         d: int = 1536,
+        index_factory: str = "Flat",
+        quantization: Literal["fp32", "fp16", "int8"] = "fp32",
     ):
         """
         Creates a FAISSVectorStore from a list of `namespaces` stored in the `dir_path`.
@@ -769,46 +2160,90 @@ class FAISSVectorStore(VectorStore):
             `namespaces` (List[str | None]): The namespaces that will be retrieved.
             `dir_path` (str, optional): The path to which all the files will be retrieved. The default is the current directory.
             `d` (int, optional): The dimension of the Vector embeddings to be stored. Must coincide with the embeddings model used. The default is 1536.
+            `index_factory` (str, optional): The FAISS index factory string used to build new indexes, e.g. `"IVF256,PQ96x8"`. It should match the one used by the saved vector store. The default is `"Flat"`.
+            `quantization` (Literal["fp32", "fp16", "int8"], optional): The precision used to store the embeddings of new flat indexes and of the normalized embeddings kept in memory. The default is `"fp32"`.
 
         Raises:
-            ValueError: if the given directory does not exist.
-            ValueError: if something goes wrong with the files.
+            ValueError: if `quantization` is not valid.
 
         Note:
             If you want to load the default index, include `None` in the list.
             Only if both the `.faiss` and `.pkl` files are found, the namespace is stored.
-            If a namespace raises an error, it will be passed.
+            If the files of a namespace cannot be loaded, a warning is logged and the namespace is skipped.
         """
         bucket = storage.bucket()
         
         local_id_: Dict[str | None, List[Vector]] = dict()
         index_: Dict[str | None, Any] = dict()
 
-        if file_path == "":
-            path = f"files/{uid}/documents/{file_id}"
-        else :
-            path = f"files/{uid}/documents/{file_path}/{file_id}" 
-
-        for namespace in namespaces:
-            try:
-                index_blob = bucket.blob(f"{path}/{'index.pkl' if namespace is None else 'index_' + namespace + '.pkl'}")
-                index = deserialize_index(pickle.loads(index_blob.download_as_bytes()))
-
-                local_id_blob = bucket.blob(f"{path}/{'local_id.pkl' if namespace is None else 'local_id_' + namespace + '.pkl'}")
-                ids = pickle.loads(local_id_blob.download_as_bytes())
-
-                index_[namespace] = index
-                local_id_[namespace] = ids
-            except Exception as e:
-                raise RuntimeError(
-                    f"Something wrong happend with the file(s) for the namespace `{namespace}`"
+        path = cls.__storage_path(uid, file_id, file_path)
+
+        def download(blob_name: str) -> IO[bytes]:
+            # Large files are spilled to disk until their namespace is loaded
+            file = tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE)
+            blob = bucket.blob(blob_name)
+            blob.chunk_size = _CHUNK_SIZE
+            blob.download_to_file(file)
+            file.seek(0)
+            return file
+
+        # The downloads are bound by the network latency, so they are sent concurrently.
+        # Each namespace is loaded as soon as its files arrive, while the rest are downloaded
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            downloads = {
+                namespace: tuple(
+                    executor.submit(download, name)
+                    for name in cls.__blob_names(path, namespace)
                 )
+                for namespace in namespaces
+            }
 
-        if None not in index_.keys():
-            index_[None] = []
-            local_id_[None] = IndexFlatIP(d)
+            for namespace, (index_download, local_id_download) in downloads.items():
+                try:
+                    with index_download.result() as file:
+                        is_pickle = file.read(1) == b"\x80"
+                        file.seek(0)
+                        if is_pickle:
+                            # Indexes saved by older versions were pickled
+                            index = deserialize_index(pickle.load(file))
+                        else:
+                            # FAISS reads the index while it is decompressed, by chunks
+                            index = read_index(
+                                PyCallbackIOReader(
+                                    _DecompressedReader(file).read, _CHUNK_SIZE
+                                )
+                            )
+
+                    with local_id_download.result() as file:
+                        is_npz = file.read(2) == b"PK"
+                        file.seek(0)
+                        if is_npz:
+                            with np.load(file) as arrays:
+                                ids = cls.__load_vectors(arrays)
+                        else:
+                            # local_id objects saved by older versions were pickled
+                            ids = pickle.loads(_decompress(file.read()))
+
+                    index_[namespace] = index
+                    local_id_[namespace] = ids
+                except Exception as e:
+                    logger.warning(
+                        "Skipping the namespace %r, its files could not be loaded: %s",
+                        namespace,
+                        e,
+                    )
 
-        return cls(local_id_, index_)
+        if None not in index_.keys():
+            index_[None] = IndexIDMap2(IndexFlatIP(d))
+            local_id_[None] = []
+
+        return cls(
+            local_id_,
+            index_,
+            d=d,
+            index_factory=index_factory,
+            quantization=quantization,
+        )
 
 
 class SofttekVectorStore(VectorStore):
@@ -820,19 +2255,47 @@ class SofttekVectorStore(VectorStore):
     - `api_key` (str): The API key for authentication with the Softtek service.
 
     ## Methods
-    - `add(vectors: List[Vector], namespace: str | None = None, **kwargs: Any)`: Add vectors to the index.
+    - `add(vectors: List[Vector], namespace: str | None = None, batch_size: int = 100, **kwargs: Any)`: Add vectors to the index.
     - `delete(ids: List[str] | None = None, delete_all: bool | None = None, namespace: str | None = None, filter: Dict | None = None, **kwargs: Any)`: Delete vectors from the index.
-    - `search(vector: Vector | None = None, id: str | None = None, top_k: int = 1, namespace: str | None = None, filter: Dict | None = None, **kwargs: Any) -> List[Vector]`: Search for vectors in the index.
+    - `search(vector: Vector | None = None, id: str | None = None, top_k: int = 1, namespace: str | None = None, filter: Dict | None = None, include_values: bool = False, include_metadata: bool = True, **kwargs: Any) -> List[Vector]`: Search for vectors in the index.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self, api_key: str, cache_size: int = 0, cache_threshold: float = 0.97
+    ):
         """Initialize a SofttekVectorStore object for managing vectors in a Softtek index.
 
         Args:
             api_key (str): The API key for authentication with the LLMOPs service.
+            cache_size (int, optional): The number of query vectors whose results are cached for each set of search arguments. If 0, the cache is disabled. Defaults to 0.
+            cache_threshold (float, optional): The minimum cosine similarity between two query vectors to reuse cached results. Defaults to 0.97.
+
+        Note:
+            The requests share a session, so the connections to the LLMOPs service are kept alive and reused between calls.
         """
         super().__init__()
         self.__api_key = api_key
+        self.__query_cache = (
+            _QueryCache(cache_size, cache_threshold) if cache_size > 0 else None
+        )
+
+        # Upsert, delete and query are idempotent, so failed POSTs can be retried
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False,
+            ),
+        )
+        self.__session = requests.Session()
+        self.__session.headers.update(
+            {"api-key": api_key, "Content-Type": "application/json"}
+        )
+        self.__session.mount("https://", adapter)
 
     @property
     def api_key(self) -> str:
@@ -844,39 +2307,64 @@ class SofttekVectorStore(VectorStore):
         self,
         vectors: List[Vector],
         namespace: str | None = None,
+        batch_size: int = 100,
         **kwargs: Any,
     ):
-        """Add vectors to the index.
+        """Add vectors to the index. The vectors are sent in batches that are upserted in parallel.
 
         Args:
             vectors (List[Vector]): A list of Vector objects to add to the index. Note that each vector must have a unique ID.
             namespace (str | None, optional): The namespace to write to. If not specified, the default namespace is used. Defaults to None.
+            batch_size (int, optional): The number of vectors to upsert in each request. Defaults to 100.
 
         Raises:
             ValueError: If any of the vectors do not have a unique ID.
             ValueError: If any of the vectors do not have embeddings.
+            ValueError: If `batch_size` is not a positive integer.
             Exception: If the request fails.
         """
-        data_to_add = []
-        ids = {}
-        for vector in vectors:
-            if not vector.id:
-                raise ValueError("Vector ID cannot be empty when adding to Pinecone.")
-            if ids.get(vector.id, None) is not None:
-                raise ValueError(
-                    f"Vector ID {vector.id} is not unique to this batch. Please make sure all vectors have unique IDs."
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer.")
+
+        if not all(vector.id for vector in vectors):
+            raise ValueError("Vector ID cannot be empty when adding to Pinecone.")
+        if len({vector.id for vector in vectors}) != len(vectors):
+            # Only the error message needs the duplicated ID
+            ids = set()
+            for vector in vectors:
+                if vector.id in ids:
+                    raise ValueError(
+                        f"Vector ID {vector.id} is not unique to this batch. Please make sure all vectors have unique IDs."
+                    )
+                ids.add(vector.id)
+
+        data_to_add = [
+            (vector.id, vector.embeddings, vector.metadata) for vector in vectors
+        ]
+
+        kwargs.update({"namespace": namespace})
+        batches = [
+            data_to_add[i : i + batch_size]
+            for i in range(0, len(data_to_add), batch_size)
+        ]
+
+        with ThreadPoolExecutor(max_workers=max(1, min(16, len(batches)))) as executor:
+            responses = list(
+                executor.map(
+                    lambda batch: self.__session.post(
+                        "https://llm-api-stk.azurewebsites.net/vector-store/upsert",
+                        data=_json_dumps({**kwargs, "vectors": batch}),
+                    ),
+                    batches,
                 )
-            data_to_add.append((vector.id, vector.embeddings, vector.metadata))
-            ids[vector.id] = 1
-
-        kwargs.update({"vectors": data_to_add, "namespace": namespace})
-        response = requests.post(
-            "https://llm-api-stk.azurewebsites.net/vector-store/upsert",
-            headers={"api-key": self.api_key},
-            json=kwargs,
-        )
-        if response.status_code != 200:
-            raise Exception(response.json()["detail"])
+            )
+
+        if self.__query_cache is not None:
+            self.__query_cache.clear()
+
+        for response in responses:
+            if response.status_code != 200:
+                raise Exception(_json_loads(response.content)["detail"])
 
     @override
     def delete(
@@ -906,14 +2394,16 @@ class SofttekVectorStore(VectorStore):
                 "filter": filter,
             }
         )
-        response = requests.post(
+        response = self.__session.post(
             "https://llm-api-stk.azurewebsites.net/vector-store/delete",
-            headers={"api-key": self.api_key},
-            json=kwargs,
+            data=_json_dumps(kwargs),
         )
 
+        if self.__query_cache is not None:
+            self.__query_cache.clear()
+
         if response.status_code != 200:
-            raise Exception(response.json()["detail"])
+            raise Exception(_json_loads(response.content)["detail"])
 
     @override
     def search(
@@ -923,6 +2413,8 @@ class SofttekVectorStore(VectorStore):
         top_k: int = 1,
         namespace: str | None = None,
         filter: Dict | None = None,
+        include_values: bool = False,
+        include_metadata: bool = True,
         **kwargs: Any,
     ) -> List[Vector]:
         """Search for vectors in the index.
@@ -933,6 +2425,8 @@ class SofttekVectorStore(VectorStore):
             top_k (int, optional): The number of results to return for each query. Defaults to 1.
             namespace (str | None, optional): The namespace to fetch vectors from. If not specified, the default namespace is used. Defaults to None.
             filter (Dict | None, optional): The filter to apply. You can use vector metadata to limit your search. Defaults to None.
+            include_values (bool, optional): Whether to fetch the embeddings of the results. If False, the returned vectors have empty embeddings. Defaults to False.
+            include_metadata (bool, optional): Whether to fetch the metadata of the results. Defaults to True.
 
         Raises:
             Exception: If the request fails.
@@ -940,6 +2434,19 @@ class SofttekVectorStore(VectorStore):
         Returns:
             List[Vector]: A list of Vector objects containing the search results.
         """
+        if vector and self.__query_cache is not None:
+            cache_key = (
+                namespace,
+                top_k,
+                include_values,
+                include_metadata,
+                json.dumps(filter, sort_keys=True, default=str),
+                json.dumps(kwargs, sort_keys=True, default=str),
+            )
+            cached = self.__query_cache.get(cache_key, vector.embeddings)
+            if cached is not None:
+                return cached
+
         kwargs.update(
             {
                 "vector": vector.embeddings if vector else None,
@@ -947,36 +2454,39 @@ class SofttekVectorStore(VectorStore):
                 "top_k": top_k,
                 "namespace": namespace,
                 "filter": filter,
-                "include_metadata": True,
-                "include_values": True,
+                "include_metadata": include_metadata,
+                "include_values": include_values,
             }
         )
-        response = requests.post(
+        response = self.__session.post(
             "https://llm-api-stk.azurewebsites.net/vector-store/query",
-            headers={"api-key": self.api_key},
-            json=kwargs,
+            data=_json_dumps(kwargs),
         )
 
         if response.status_code != 200:
-            raise Exception(response.json()["detail"])
+            raise Exception(_json_loads(response.content)["detail"])
+
+        json_response = _json_loads(response.content)
 
-        json_response = response.json()
+        base_metadata = dict(vector.metadata) if vector else {}
 
         vectors = []
         for match in json_response["matches"]:
-            metadata = vector.metadata if vector else {}
-            match_metadata = match.get("metadata")
-            if match_metadata:
-                metadata.update(match_metadata)
-            metadata.update({"score": match["score"]})
             vectors.append(
                 Vector(
-                    embeddings=match["values"],
+                    embeddings=match.get("values") or [],
                     id=match["id"],
-                    metadata=metadata,
+                    metadata={
+                        **base_metadata,
+                        **(match.get("metadata") or {}),
+                        "score": match["score"],
+                    },
                 )
             )
 
+        if vector and self.__query_cache is not None:
+            self.__query_cache.put(cache_key, vector.embeddings, vectors)
+
         return vectors
 
 
@@ -991,38 +2501,56 @@ class SupabaseVectorStore(VectorStore):
     - `index_name` (str): The name of the table where vectors will be stored and retrieved.
 
     ## Methods
-    - `add(vectors: List[Vector], **kwargs: Any)`: Add vectors to the index.
+    - `add(vectors: List[Vector], batch_size: int = 500, **kwargs: Any)`: Add vectors to the index.
     - `delete(ids: List[str] | None = None, **kwargs: Any)`: Delete vectors from the index.
     - `search(vector: Vector | None = None, limit: int = 1, **kwargs: Any) -> List[Vector]`: Search for vectors in the index.
     """
 
     @override
-    def __init__(self, api_key: str, url: str, index_name: str):
+    def __init__(
+        self,
+        api_key: str,
+        url: str,
+        index_name: str,
+        cache_size: int = 0,
+        cache_threshold: float = 0.97,
+    ):
         """Initialize a SupabaseVectorStore object for managing vectors in a Supabase table.
 
         Args:
             api_key (str): The API key for authentication with the Supabase service.
             url (str): The Supabase URL.
             index_name (str): The name of the table where vectors will be stored and retrieved.
+            cache_size (int, optional): The number of query vectors whose results are cached for each `top_k`. If 0, the cache is disabled. Defaults to 0.
+            cache_threshold (float, optional): The minimum cosine similarity between two query vectors to reuse cached results. Defaults to 0.97.
         """
         self.__client = create_client(url, api_key)
         self.__index_name = index_name
+        self.__query_cache = (
+            _QueryCache(cache_size, cache_threshold) if cache_size > 0 else None
+        )
 
     @override
-    def add(self, vectors: List[Vector], **kwargs: Any):
-        """Add vectors to the index.
+    def add(self, vectors: List[Vector], batch_size: int = 500, **kwargs: Any):
+        """Add vectors to the index. The vectors are inserted in order in batches, with one request per batch.
 
         Args:
             vectors (List[Vector]): A list of Vector objects to add to the index. Note that each vector must have a unique ID.
+            batch_size (int, optional): The number of vectors to insert in each request. Defaults to 500.
 
         Raises:
             ValueError: If any of the vectors do not have embeddings.
+            ValueError: If `batch_size` is not a positive integer.
 
         Note:
             - Requires a table with columns: `id` (text), `vector` (vector(1536 or dimension of embeddings model used)), `metadata` (json), `created_at` (timestamp).
             - **Vector type is enabled with the vector extension for postgres in supabase**.
             - Requires default value of `id` to `gen_random_uuid()`.
         """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer.")
+
+        rows = []
         for vector in vectors:
             # if not vector.id:
             #     raise ValueError("Vector ID cannot be empty when adding to Supabase.")
@@ -1032,10 +2560,25 @@ class SupabaseVectorStore(VectorStore):
                 )
             vec = {"vector": vector.embeddings, "metadata": vector.metadata}
             if vector.id is not None and vector.id != "":
-                print("id is not none")
                 vec["id"] = vector.id
-            print(vec)
-            self.__client.table(self.__index_name).insert(vec).execute()
+            rows.append(vec)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            for vec in rows:
+                logger.debug("Row to insert: %r", vec)
+
+        # PostgREST fills the columns missing in some rows of a bulk insert
+        # with NULL instead of their default, so each batch only holds
+        # consecutive rows that all have an id or all lack one
+        for _, group in groupby(rows, key=lambda vec: "id" in vec):
+            group = list(group)
+            for i in range(0, len(group), batch_size):
+                self.__client.table(self.__index_name).insert(
+                    group[i : i + batch_size]
+                ).execute()
+
+        if self.__query_cache is not None:
+            self.__query_cache.clear()
 
     @override
     def delete(self, ids: List[str] | None = None, **kwargs: Any):
@@ -1046,6 +2589,9 @@ class SupabaseVectorStore(VectorStore):
         """
         self.__client.table(self.__index_name).delete().in_("id", ids).execute()
 
+        if self.__query_cache is not None:
+            self.__query_cache.clear()
+
     @override
     def search(
         self, vector: Vector | None = None, top_k: int = 1, **kwargs: Any
@@ -1083,23 +2629,47 @@ class SupabaseVectorStore(VectorStore):
         $$;
         ```
         """
+        if self.__query_cache is not None:
+            cached = self.__query_cache.get(top_k, vector.embeddings)
+            if cached is not None:
+                return cached
+
         query_response = self.__client.rpc(
             "similarity_search_" + self.__index_name,
             {"embedding": vector.embeddings, "match_count": top_k},
         ).execute()
+        base_metadata = dict(vector.metadata) if vector else {}
+        matches = query_response.data
+
+        # All the vectors have the same dimension, so they are parsed in a single call
+        embeddings = (
+            np.fromstring(
+                ",".join(match["value"][1:-1] for match in matches), sep=","
+            )
+            .reshape(len(matches), -1)
+            .tolist()
+            if matches
+            else []
+        )
+
         vectors = []
-        print(query_response.data)
-        for match in query_response.data:
-            print(match)
-            metadata = vector.metadata if vector else {}
-            metadata.update(match["metadata"])
-            metadata["score"] = match["similarity"]
-            parsed_vector = [float(i) for i in match["value"][1:-1].split(",")]
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for match, parsed_vector in zip(matches, embeddings):
+            if debug:
+                logger.debug("Match: %r", match)
             vectors.append(
                 Vector(
                     embeddings=parsed_vector,
                     id=match["id"],
-                    metadata=metadata,
+                    metadata={
+                        **base_metadata,
+                        **(match["metadata"] or {}),
+                        "score": match["similarity"],
+                    },
                 )
             )
+
+        if self.__query_cache is not None:
+            self.__query_cache.put(top_k, vector.embeddings, vectors)
+
         return vectors
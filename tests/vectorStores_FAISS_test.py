@@ -1,6 +1,14 @@
 import unittest
 import os
+import pickle
 import shutil
+import tempfile
+from unittest.mock import patch
+
+import faiss
+import numpy as np
+from faiss import get_num_gpus
+from softtek_llm import vectorStores
 from softtek_llm.vectorStores import FAISSVectorStore, Vector
 
 
@@ -51,7 +59,146 @@ class TestFAISSVectorStoreInit(unittest.TestCase):
         vectors = self.vector_store.search(vector=self.vector, top_k=3)
 
         # Assert the top_k = 1 to the first vector of vector_1
-        self.assertEqual(vectors, [self.vectors_1[2], self.vectors_2[1], self.vectors_1[1]])
+        self.assertEqual([vector.id for vector in vectors], ["3", "5", "2"])
+
+        # Assert the score is only added to the returned vectors
+        self.assertIn("score", vectors[0].metadata)
+        self.assertEqual(
+            self.vector_store.local_id[None][2].metadata, {"name": "vector_3"}
+        )
+
+    def test_search_id(self):
+        # Adds vectors
+        self.vector_store.add(vectors=self.vectors_1)
+
+        # Search using a stored vector as the query
+        vectors = self.vector_store.search(id="3", top_k=1)
+
+        # Assert the closest vector is the vector itself
+        self.assertEqual([vector.id for vector in vectors], ["3"])
+
+    def test_search_vector_hnsw(self):
+        # Create a vector store with an HNSW index
+        vector_store = FAISSVectorStore(d=3, index_factory="HNSW32")
+
+        # Adds vectors
+        vector_store.add(vectors=self.vectors_1)
+
+        # Search
+        vectors = vector_store.search(vector=self.vector, top_k=1)
+
+        # Assert the top_k = 1 to the last vector of vector_1
+        self.assertEqual([vector.id for vector in vectors], ["3"])
+
+    def test_search_vector_cache(self):
+        # Create a vector store with a query cache
+        vector_store = FAISSVectorStore(d=3, cache_size=8)
+
+        # Adds vectors and search
+        vector_store.add(vectors=self.vectors_1)
+        vectors = vector_store.search(vector=self.vector, top_k=1)
+
+        # Assert a similar query returns the cached results
+        similar = Vector(embeddings=[0.6, 0.4, 0.2])
+        self.assertEqual(vector_store.search(vector=similar, top_k=1), vectors)
+
+        # Assert adding vectors invalidates the cache
+        vector_store.add(vectors=[self.vector])
+        self.assertEqual(
+            vector_store.search(vector=similar, top_k=1)[0].id, self.vector.id
+        )
+
+    def test_search_vector_cache_mutated_results(self):
+        # Create a vector store with a query cache and search
+        vector_store = FAISSVectorStore(d=3, cache_size=4)
+        vector_store.add(vectors=self.vectors_1)
+        vector_store.search(vector=self.vector, top_k=1)
+
+        # Assert popping the score of a cached result does not affect later hits
+        for _ in range(2):
+            vectors = vector_store.search(vector=self.vector, top_k=1)
+            self.assertIn("score", vectors[0].metadata)
+            vectors[0].metadata.pop("score")
+
+    def test_search_vector_fast_mode(self):
+        # Adds vectors
+        self.vector_store.add(vectors=self.vectors_1)
+
+        # Assert the fast mode returns the same vectors as the index
+        self.assertEqual(
+            [
+                vector.id
+                for vector in self.vector_store.search(
+                    vector=self.vector, top_k=3, fast_mode=True
+                )
+            ],
+            [
+                vector.id
+                for vector in self.vector_store.search(vector=self.vector, top_k=3)
+            ],
+        )
+
+    def test_search_batch(self):
+        # Adds vectors
+        self.vector_store.add(vectors=self.vectors_1)
+
+        # Assert each query returns the same vectors as a single search
+        queries = [self.vector, self.vectors_1[0]]
+        self.assertEqual(
+            self.vector_store.search_batch(vectors=queries, top_k=2),
+            [self.vector_store.search(vector=query, top_k=2) for query in queries],
+        )
+
+    def test_search_vector_quantized(self):
+        # Adds vectors to a store with int8 embeddings, searched in blocks of two rows
+        vector_store = FAISSVectorStore(d=3, quantization="int8")
+        vector_store.add(vectors=self.vectors_1)
+        vector_store.add(vectors=self.vectors_2)
+        self.vector_store.add(vectors=self.vectors_1)
+
+        with patch.object(vectorStores, "_DECODE_ROWS", 2):
+            vectors = vector_store.search(vector=self.vector, top_k=10)
+
+        # Assert all the vectors are returned, closest first, with scores close to fp32
+        self.assertEqual(len(vectors), 5)
+        self.assertEqual(vectors[0].id, "3")
+        self.assertAlmostEqual(
+            vectors[0].metadata["score"],
+            self.vector_store.search(vector=self.vector, top_k=1)[0].metadata["score"],
+            places=2,
+        )
+
+    @unittest.skipIf(get_num_gpus() > 0, "a GPU is available")
+    def test_gpu_fallback(self):
+        # Assert the vector store warns and falls back to the CPU
+        with self.assertWarns(UserWarning):
+            vector_store = FAISSVectorStore(d=3, gpu=True)
+        self.assertFalse(vector_store.gpu)
+
+        # Assert the vector store still works
+        vector_store.add(vectors=self.vectors_1)
+        self.assertEqual(vector_store.search(id="1", top_k=1)[0].id, "1")
+
+    def test_fast_mode_with_replicated_index(self):
+        def to_replicas(index):
+            # Stand-in for a multi-GPU copy, which has no inner index
+            replicas = faiss.IndexReplicas(index.d)
+            replicas.addIndex(faiss.clone_index(index))
+            return replicas
+
+        with patch.object(vectorStores, "get_num_gpus", return_value=2), patch.object(
+            vectorStores, "index_cpu_to_all_gpus", side_effect=to_replicas
+        ):
+            vector_store = FAISSVectorStore(d=3, gpu=True)
+            vector_store.add(vectors=self.vectors_1)
+
+        # Assert fast mode is decided from the CPU index
+        self.assertEqual(
+            vector_store.search(vector=self.vectors_1[2], top_k=1, fast_mode=True)[
+                0
+            ].id,
+            "3",
+        )
 
     def test_save_local_and_load_local(self):
         # Adds vectors
@@ -61,14 +208,14 @@ class TestFAISSVectorStoreInit(unittest.TestCase):
         # Save the data
         self.vector_store.save_local(dir_path=self.path, save_all=True)
 
-        # Assert the file exists (both .faiss and .pkl)
+        # Assert the file exists (both .faiss and .npz)
         self.assertTrue(os.path.isfile(os.path.join(self.path, "index.faiss")))
-        self.assertTrue(os.path.isfile(os.path.join(self.path, "index.pkl")))
+        self.assertTrue(os.path.isfile(os.path.join(self.path, "index.npz")))
         self.assertTrue(
             os.path.isfile(os.path.join(self.path, f"{self.namespace}_index.faiss"))
         )
         self.assertTrue(
-            os.path.isfile(os.path.join(self.path, f"{self.namespace}_index.pkl"))
+            os.path.isfile(os.path.join(self.path, f"{self.namespace}_index.npz"))
         )
 
         # Create object from a list of namespaces
@@ -81,6 +228,78 @@ class TestFAISSVectorStoreInit(unittest.TestCase):
         self.assertEqual(list(vs.index.keys()), [None, self.namespace])
         self.assertEqual(list(vs.local_id.keys()), [None, self.namespace])
 
+        # Assert the vectors are restored
+        self.assertEqual(vs.local_id[None], self.vector_store.local_id[None])
+        self.assertEqual(vs.search(id="2", top_k=1)[0].id, "2")
+
+        # Delete the directory with the data
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+
+    def test_save_local_precision(self):
+        # Save the default namespace with half precision
+        self.vector_store.add(vectors=self.vectors_1)
+        self.vector_store.save_local(dir_path=self.path, precision="fp16")
+
+        # Assert the saved index is quantized and the vectors are still found
+        vs = FAISSVectorStore.load_local(
+            dir_path=self.path, namespaces=[None], d=3, quantization="fp16"
+        )
+        self.assertEqual(vs.quantization, "fp16")
+        self.assertTrue(
+            isinstance(
+                faiss.downcast_index(vs.index[None].index), faiss.IndexScalarQuantizer
+            )
+        )
+        self.assertEqual(vs.search(id="3", top_k=1)[0].id, "3")
+
+        # Assert an invalid precision raises an error
+        with self.assertRaises(ValueError):
+            self.vector_store.save_local(dir_path=self.path, precision="fp8")
+
+        # Delete the directory with the data
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+
+    def test_load_local_without_default_namespace(self):
+        # Adds vectors to a namespace
+        self.vector_store.add(vectors=self.vectors_2, namespace=self.namespace)
+
+        # Save the data
+        self.vector_store.save_local(dir_path=self.path, namespace=self.namespace)
+
+        # Create object without the default namespace
+        vs = FAISSVectorStore.load_local(
+            dir_path=self.path, namespaces=[self.namespace], d=3
+        )
+
+        # Assert the default namespace is empty and usable
+        self.assertEqual(vs.local_id[None], [])
+        self.assertEqual(vs.index[None].ntotal, 0)
+        vs.add(vectors=self.vectors_1)
+        self.assertEqual(vs.search(id="2", top_k=1)[0].id, "2")
+
+        # Delete the directory with the data
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+
+    def test_load_local_skips_missing_namespace(self):
+        # Adds vectors
+        self.vector_store.add(vectors=self.vectors_1)
+
+        # Save the data
+        self.vector_store.save_local(dir_path=self.path)
+
+        # Create object from a list with a namespace that was not saved
+        with self.assertLogs("softtek_llm.vectorStores", level="WARNING"):
+            vs = FAISSVectorStore.load_local(
+                dir_path=self.path, namespaces=[None, "missing"], d=3
+            )
+
+        # Assert only the saved namespace is loaded
+        self.assertEqual(list(vs.local_id.keys()), [None])
+        self.assertEqual(vs.local_id[None], self.vector_store.local_id[None])
+
         # Delete the directory with the data
         if os.path.isdir(self.path):
             shutil.rmtree(self.path)
@@ -96,6 +315,113 @@ class TestFAISSVectorStoreInit(unittest.TestCase):
         self.assertEqual(self.vector_store.local_id[self.namespace][0].id, "5")
         self.assertEqual(self.vector_store.index[self.namespace].ntotal, 1)
 
+    def test_delete_and_search(self):
+        # Adds vectors
+        self.vector_store.add(vectors=self.vectors_1)
+
+        # Delete a vector in the middle of the namespace
+        self.vector_store.delete(ids=["2"])
+
+        # Assert the local_id vectors and the index size
+        self.assertEqual(
+            [vector.id for vector in self.vector_store.local_id[None]], ["1", "3"]
+        )
+        self.assertEqual(self.vector_store.index[None].ntotal, 2)
+
+        # Assert the remaining vectors are still found by id
+        self.assertEqual(self.vector_store.search(id="3", top_k=1)[0].id, "3")
+
+    def test_delete_and_search_ivf(self):
+        # Create a vector store with an IVF index, trained on the first add
+        vector_store = FAISSVectorStore(d=16, index_factory="IVF4,Flat")
+        vector_store.set_search_parameters(nprobe=4)
+        rng = np.random.default_rng(0)
+        vector_store.add(
+            vectors=[
+                Vector(id=f"v{i}", embeddings=list(rng.random(16))) for i in range(400)
+            ]
+        )
+
+        centroids = faiss.extract_index_ivf(vector_store.index[None].index).quantizer
+        centroids = centroids.reconstruct_n(0, centroids.ntotal)
+
+        # Delete some vectors
+        vector_store.delete(ids=[f"v{i}" for i in range(40)])
+
+        # Assert the index was not retrained
+        quantizer = faiss.extract_index_ivf(vector_store.index[None].index).quantizer
+        np.testing.assert_array_equal(
+            quantizer.reconstruct_n(0, quantizer.ntotal), centroids
+        )
+
+        # Assert the remaining vectors are still found by id
+        self.assertEqual(vector_store.index[None].ntotal, 360)
+        for i in range(100, 150):
+            self.assertEqual(vector_store.search(id=f"v{i}", top_k=1)[0].id, f"v{i}")
+
+    def test_add_trains_pq_index(self):
+        # Create a vector store with a PQ index, which needs 256 vectors to train
+        vector_store = FAISSVectorStore(d=16, index_factory="IVF4,PQ4")
+        rng = np.random.default_rng(0)
+        for batch in range(3):
+            vector_store.add(
+                vectors=[
+                    Vector(id=f"v{batch}_{i}", embeddings=list(rng.random(16)))
+                    for i in range(100)
+                ]
+            )
+
+        # Assert every vector was added exactly once
+        self.assertEqual(vector_store.index[None].ntotal, 300)
+        self.assertEqual(len(vector_store.local_id[None]), 300)
+
+    def test_add_failure_leaves_namespace_untouched(self):
+        self.vector_store.add(vectors=self.vectors_1)
+
+        # Add a batch with a vector of the wrong size
+        with self.assertRaises(ValueError):
+            self.vector_store.add(
+                vectors=self.vectors_2 + [Vector(id="bad", embeddings=[1.0, 2.0])]
+            )
+
+        # Assert the previous vectors are unchanged and the batch can be retried
+        self.assertEqual(self.vector_store.index[None].ntotal, len(self.vectors_1))
+        self.vector_store.add(vectors=self.vectors_2)
+        self.assertEqual(
+            [vector.id for vector in self.vector_store.local_id[None]],
+            ["1", "2", "3", "4", "5"],
+        )
+
+    def test_reserve_and_compact(self):
+        # Preallocate memory and add vectors
+        self.vector_store.reserve(100)
+        self.vector_store.add(vectors=self.vectors_1)
+
+        # Release the preallocated memory
+        self.vector_store.compact()
+
+        # Assert the vectors are still found and new ones can be added
+        self.assertEqual(self.vector_store.search(id="2", top_k=1)[0].id, "2")
+        self.vector_store.add(vectors=self.vectors_2)
+        self.assertEqual(self.vector_store.index[None].ntotal, 5)
+        self.assertEqual(
+            [vector.id for vector in self.vector_store.local_id[None]],
+            ["1", "2", "3", "4", "5"],
+        )
+
+        # Assert a namespace that does not exist raises an error
+        with self.assertRaises(ValueError):
+            self.vector_store.compact(namespace="missing")
+
+    def test_reserve_exact_size(self):
+        # Adds vectors and reserve memory for one more
+        self.vector_store.add(vectors=self.vectors_1)
+        self.vector_store.reserve(4)
+
+        # Assert the buffer holds exactly the reserved vectors
+        buffer = self.vector_store._FAISSVectorStore__norm_buffer[None]
+        self.assertEqual(len(buffer), 4)
+
     def test_delete_all(self):
         # Adds vectors
         self.vector_store.add(vectors=self.vectors_1)
@@ -108,5 +434,205 @@ class TestFAISSVectorStoreInit(unittest.TestCase):
         self.assertEqual(self.vector_store.index[None].ntotal, 0)
 
 
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = vectorStores._QueryCache(max_size=3, threshold=0.99, max_keys=2)
+
+    def test_oldest_query_is_replaced(self):
+        for i in range(4):
+            self.cache.put(
+                "key", list(np.eye(4)[i]), [Vector(id=str(i), embeddings=[])]
+            )
+
+        # Assert only the three most recent queries are cached
+        self.assertIsNone(self.cache.get("key", list(np.eye(4)[0])))
+        for i in range(1, 4):
+            self.assertEqual(self.cache.get("key", list(np.eye(4)[i]))[0].id, str(i))
+
+    def test_results_are_copied(self):
+        results = [Vector(id="1", embeddings=[], metadata={"score": 0.5})]
+        self.cache.put("key", [1.0, 0.0], results)
+
+        # Mutate the cached results, as `Cache` does with the score
+        results[0].metadata.pop("score")
+        self.cache.get("key", [1.0, 0.0])[0].metadata.pop("score")
+
+        # Assert the next hit still has the score
+        self.assertEqual(self.cache.get("key", [1.0, 0.0])[0].metadata["score"], 0.5)
+
+    def test_least_recently_used_key_is_evicted(self):
+        for key in ("a", "b"):
+            self.cache.put(key, [1.0, 0.0], [Vector(id=key, embeddings=[])])
+        self.cache.get("a", [1.0, 0.0])
+        self.cache.put("c", [1.0, 0.0], [Vector(id="c", embeddings=[])])
+
+        # Assert "b" was evicted, since "a" was used more recently
+        self.assertIsNone(self.cache.get("b", [1.0, 0.0]))
+        self.assertEqual(self.cache.get("a", [1.0, 0.0])[0].id, "a")
+        self.assertEqual(self.cache.get("c", [1.0, 0.0])[0].id, "c")
+
+
+class TestCompression(unittest.TestCase):
+    data = pickle.dumps(list(range(100000)))
+
+    def round_trip(self) -> bytes:
+        file = tempfile.SpooledTemporaryFile()
+        with vectorStores._CompressedWriter(file) as writer:
+            writer.write(self.data)
+        file.seek(0)
+
+        return vectorStores._decompress(file.read())
+
+    def stream_round_trip(self) -> bytes:
+        file = tempfile.SpooledTemporaryFile()
+        with vectorStores._CompressedWriter(file) as writer:
+            writer.write(self.data)
+        file.seek(0)
+
+        reader = vectorStores._DecompressedReader(file)
+        return b"".join(iter(lambda: reader.read(1000), b""))
+
+    @unittest.skipIf(vectorStores.zstandard is None, "zstandard is not installed")
+    def test_round_trip_zstd(self):
+        self.assertEqual(self.round_trip(), self.data)
+        self.assertEqual(self.stream_round_trip(), self.data)
+
+    def test_round_trip_zlib(self):
+        with patch.object(vectorStores, "zstandard", None):
+            self.assertEqual(self.round_trip(), self.data)
+            self.assertEqual(self.stream_round_trip(), self.data)
+
+    def test_uncompressed_data(self):
+        self.assertEqual(vectorStores._decompress(self.data), self.data)
+
+        file = tempfile.SpooledTemporaryFile()
+        file.write(self.data)
+        file.seek(0)
+        reader = vectorStores._DecompressedReader(file)
+        self.assertEqual(b"".join(iter(lambda: reader.read(1000), b"")), self.data)
+
+
+class FakeBlob:
+    def __init__(self, files: dict, name: str):
+        self.files = files
+        self.name = name
+        self.chunk_size = None
+
+    def upload_from_file(self, file, rewind=False, content_type=None):
+        if rewind:
+            file.seek(0)
+        self.files[self.name] = file.read()
+
+    def download_to_file(self, file):
+        file.write(self.files[self.name])
+
+
+class FakeBucket:
+    def __init__(self):
+        self.files = dict()
+
+    def blob(self, name: str) -> FakeBlob:
+        return FakeBlob(self.files, name)
+
+
+class TestFAISSVectorStoreFirebase(unittest.TestCase):
+    namespace = "test-1"
+    vectors_1 = [
+        Vector(
+            id=str(i),
+            embeddings=list(np.random.default_rng(i).random(8)),
+            metadata={"i": i},
+        )
+        for i in range(20)
+    ]
+    vectors_2 = [
+        Vector(id=f"n{i}", embeddings=list(np.random.default_rng(100 + i).random(8)))
+        for i in range(5)
+    ]
+
+    def setUp(self):
+        self.bucket = FakeBucket()
+        patcher = patch.object(vectorStores.storage, "bucket", return_value=self.bucket)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.vector_store = FAISSVectorStore(d=8)
+        self.vector_store.add(vectors=self.vectors_1)
+        self.vector_store.add(vectors=self.vectors_2, namespace=self.namespace)
+
+    def test_save_and_load(self):
+        # Save all the namespaces
+        self.vector_store.save_firebase_storage("uid", "file", save_all=True)
+
+        # Assert the files of both namespaces are uploaded
+        self.assertEqual(
+            sorted(self.bucket.files.keys()),
+            [
+                "files/uid/documents/file/index.pkl",
+                f"files/uid/documents/file/index_{self.namespace}.pkl",
+                "files/uid/documents/file/local_id.pkl",
+                f"files/uid/documents/file/local_id_{self.namespace}.pkl",
+            ],
+        )
+
+        # Load both namespaces
+        vs = FAISSVectorStore.load_firebase_storage(
+            "uid", "file", namespaces=[None, self.namespace], d=8
+        )
+
+        # Assert the vectors are restored and searchable
+        self.assertEqual(vs.local_id[None], self.vector_store.local_id[None])
+        self.assertEqual(
+            vs.local_id[self.namespace], self.vector_store.local_id[self.namespace]
+        )
+        self.assertEqual(vs.search(id="7", top_k=1)[0].id, "7")
+        self.assertEqual(
+            vs.search(id="n3", top_k=1, namespace=self.namespace)[0].id, "n3"
+        )
+
+    def test_save_and_load_zlib(self):
+        with patch.object(vectorStores, "zstandard", None):
+            self.vector_store.save_firebase_storage("uid", "file")
+            vs = FAISSVectorStore.load_firebase_storage("uid", "file", d=8)
+
+        self.assertEqual(vs.local_id[None], self.vector_store.local_id[None])
+
+    def test_save_and_load_precision(self):
+        # Save the default namespace with half precision
+        self.vector_store.save_firebase_storage("uid", "file", precision="fp16")
+        vs = FAISSVectorStore.load_firebase_storage(
+            "uid", "file", d=8, quantization="fp16"
+        )
+        self.assertEqual(vs.quantization, "fp16")
+
+        # Assert the vectors are still found
+        self.assertEqual(vs.search(id="7", top_k=1)[0].id, "7")
+
+        # Assert an invalid precision raises an error
+        with self.assertRaises(ValueError):
+            self.vector_store.save_firebase_storage("uid", "file", precision="fp8")
+
+    def test_load_legacy_pickle(self):
+        # Files saved by older versions were pickled without compression
+        self.vector_store.save_firebase_storage("uid", "file")
+        self.bucket.files["files/uid/documents/file/local_id.pkl"] = pickle.dumps(
+            self.vector_store.local_id[None]
+        )
+
+        vs = FAISSVectorStore.load_firebase_storage("uid", "file", d=8)
+
+        self.assertEqual(vs.local_id[None], self.vector_store.local_id[None])
+
+    def test_load_skips_missing_namespace(self):
+        self.vector_store.save_firebase_storage("uid", "file")
+
+        with self.assertLogs("softtek_llm.vectorStores", level="WARNING"):
+            vs = FAISSVectorStore.load_firebase_storage(
+                "uid", "file", namespaces=[None, "missing"], d=8
+            )
+
+        self.assertEqual(list(vs.local_id.keys()), [None])
+
+
 if __name__ == "__main__":
     unittest.main()
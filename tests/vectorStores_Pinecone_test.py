@@ -0,0 +1,143 @@
+import unittest
+from concurrent.futures import Future
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from softtek_llm import vectorStores
+from softtek_llm.vectorStores import PineconeVectorStore, Vector
+
+
+class FakeApplyResult:
+    # Returned by the REST client for async requests
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+
+    def get(self):
+        if self.error is not None:
+            raise self.error
+
+
+class FakeIndex:
+    def __init__(self):
+        self.upserts = []
+        self.namespaces = {"": None}
+        self.stats_calls = 0
+        self.use_futures = False
+        self.error = None
+
+    def upsert(self, vectors: list, namespace: str | None, async_req: bool):
+        self.upserts.append((vectors, namespace))
+        self.namespaces[namespace or ""] = None
+        if not self.use_futures:
+            return FakeApplyResult(self.error)
+
+        # Returned by the gRPC client for async requests
+        future = Future()
+        if self.error is not None:
+            future.set_exception(self.error)
+        else:
+            future.set_result(None)
+        return future
+
+    def delete(self, ids, delete_all, namespace, filter):
+        if delete_all:
+            self.namespaces.pop(namespace or "", None)
+
+    def describe_index_stats(self):
+        self.stats_calls += 1
+        return SimpleNamespace(namespaces=dict(self.namespaces))
+
+
+class FakePinecone:
+    def __init__(self, index: FakeIndex):
+        self.index = index
+
+    def list_indexes(self):
+        return SimpleNamespace(names=lambda: ["index"])
+
+    def Index(self, name: str, pool_threads: int) -> FakeIndex:
+        return self.index
+
+
+class TestPineconeVectorStore(unittest.TestCase):
+    vectors = [Vector(id=str(i), embeddings=[float(i), 1.0]) for i in range(5)]
+
+    def setUp(self):
+        self.index = FakeIndex()
+        with patch.object(
+            vectorStores, "Pinecone", return_value=FakePinecone(self.index)
+        ):
+            self.vector_store = PineconeVectorStore("api_key", "index", use_grpc=False)
+
+    def test_add_in_batches(self):
+        self.vector_store.add(self.vectors, namespace="ns", batch_size=2)
+
+        # Assert the vectors are upserted in order, with one request per batch
+        self.assertEqual(
+            [[row[0] for row in vectors] for vectors, _ in self.index.upserts],
+            [["0", "1"], ["2", "3"], ["4"]],
+        )
+        self.assertEqual({namespace for _, namespace in self.index.upserts}, {"ns"})
+
+    def test_add_waits_for_futures(self):
+        # Assert the results of both the REST and the gRPC clients are awaited
+        for use_futures in (False, True):
+            self.index.use_futures = use_futures
+            self.index.error = None
+            self.vector_store.add(self.vectors, batch_size=2)
+
+            # Assert a failed batch raises its error
+            self.index.error = RuntimeError("upsert failed")
+            with self.assertRaisesRegex(RuntimeError, "upsert failed"):
+                self.vector_store.add(self.vectors, batch_size=2)
+
+    def test_add_invalid_vectors(self):
+        with self.assertRaises(ValueError):
+            self.vector_store.add([Vector(id="", embeddings=[1.0])])
+        with self.assertRaises(ValueError):
+            self.vector_store.add([self.vectors[0], self.vectors[0]])
+        with self.assertRaises(ValueError):
+            self.vector_store.add(self.vectors, batch_size=0)
+
+        # Assert nothing was upserted
+        self.assertEqual(self.index.upserts, [])
+
+    def test_namespace_exists_reuses_stats(self):
+        with patch.object(vectorStores.time, "monotonic", return_value=100.0):
+            self.assertTrue(self.vector_store.namespace_exists(""))
+            self.assertFalse(self.vector_store.namespace_exists("ns"))
+
+        # Assert the stats are requested once within the TTL
+        self.assertEqual(self.index.stats_calls, 1)
+
+        # Assert the stats are requested again once the TTL expires
+        with patch.object(
+            vectorStores.time,
+            "monotonic",
+            return_value=100.0 + PineconeVectorStore.STATS_TTL,
+        ):
+            self.vector_store.namespace_exists("")
+        self.assertEqual(self.index.stats_calls, 2)
+
+    def test_writes_invalidate_stats(self):
+        with patch.object(vectorStores.time, "monotonic", return_value=100.0):
+            self.assertFalse(self.vector_store.namespace_exists("ns"))
+
+            # Assert adding to an existing namespace keeps the stats
+            self.vector_store.add(self.vectors)
+            self.vector_store.namespace_exists("")
+            self.assertEqual(self.index.stats_calls, 1)
+
+            # Assert adding to a new namespace invalidates the stats
+            self.vector_store.add(self.vectors, namespace="ns")
+            self.assertTrue(self.vector_store.namespace_exists("ns"))
+            self.assertEqual(self.index.stats_calls, 2)
+
+            # Assert deleting a whole namespace invalidates the stats
+            self.vector_store.delete(delete_all=True, namespace="ns")
+            self.assertFalse(self.vector_store.namespace_exists("ns"))
+            self.assertEqual(self.index.stats_calls, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from softtek_llm import vectorStores
+from softtek_llm.vectorStores import SupabaseVectorStore, Vector
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeClient", name: str, args: tuple):
+        self.client = client
+        self.name = name
+        self.args = args
+
+    def in_(self, column: str, values: list):
+        self.args += (column, values)
+        return self
+
+    def execute(self):
+        self.client.requests.append((self.name, *self.args))
+        if self.name == "rpc":
+            return SimpleNamespace(data=self.client.matches)
+        return SimpleNamespace(data=[])
+
+
+class FakeTable:
+    def __init__(self, client: "FakeClient"):
+        self.client = client
+
+    def insert(self, rows: list):
+        return FakeQuery(self.client, "insert", (rows,))
+
+    def delete(self):
+        return FakeQuery(self.client, "delete", ())
+
+
+class FakeClient:
+    def __init__(self):
+        self.requests = []
+        self.matches = []
+
+    def table(self, name: str) -> FakeTable:
+        return FakeTable(self)
+
+    def rpc(self, name: str, params: dict) -> FakeQuery:
+        return FakeQuery(self, "rpc", (name, params))
+
+
+class FakeSupabaseVectorStore(SupabaseVectorStore):
+    # SupabaseVectorStore does not implement the abstract `index` property
+    index = None
+
+
+class TestSupabaseVectorStore(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.client.matches = [
+            {"id": "1", "similarity": 0.9, "value": "[0.1,0.2]", "metadata": {"a": 1}}
+        ]
+        with patch.object(vectorStores, "create_client", return_value=self.client):
+            self.vector_store = FakeSupabaseVectorStore(
+                "api_key", "url", "table", cache_size=4
+            )
+
+    def rpc_count(self) -> int:
+        return sum(request[0] == "rpc" for request in self.client.requests)
+
+    def inserted_batches(self) -> list:
+        return [
+            request[1] for request in self.client.requests if request[0] == "insert"
+        ]
+
+    def test_add_in_batches(self):
+        vectors = [Vector(id=str(i), embeddings=[float(i), 1.0]) for i in range(5)]
+
+        self.vector_store.add(vectors, batch_size=2)
+
+        # Assert the rows are inserted in order, with one request per batch
+        self.assertEqual(
+            [[row["id"] for row in batch] for batch in self.inserted_batches()],
+            [["0", "1"], ["2", "3"], ["4"]],
+        )
+
+    def test_add_with_and_without_ids(self):
+        vectors = [
+            Vector(id="1", embeddings=[0.1, 0.2]),
+            Vector(embeddings=[0.3, 0.4]),
+            Vector(embeddings=[0.5, 0.6]),
+            Vector(id="4", embeddings=[0.7, 0.8]),
+        ]
+
+        self.vector_store.add(vectors)
+
+        # Assert rows with and without id are never mixed, and keep their order
+        self.assertEqual(
+            [[row.get("id") for row in batch] for batch in self.inserted_batches()],
+            [["1"], [None, None], ["4"]],
+        )
+        self.assertEqual(
+            [row["vector"] for batch in self.inserted_batches() for row in batch],
+            [vector.embeddings for vector in vectors],
+        )
+
+    def test_add_validates_before_inserting(self):
+        vectors = [Vector(id="1", embeddings=[0.1, 0.2]), Vector(id="2", embeddings=[])]
+
+        # Assert nothing is inserted when a vector has no embeddings
+        with self.assertRaises(ValueError):
+            self.vector_store.add(vectors)
+        self.assertEqual(self.inserted_batches(), [])
+
+        with self.assertRaises(ValueError):
+            self.vector_store.add(vectors[:1], batch_size=0)
+
+    def test_search_cache(self):
+        query = Vector(embeddings=[0.1, 0.2])
+
+        # Pop the score of each result, as `Cache` does
+        for _ in range(3):
+            vectors = self.vector_store.search(vector=query, top_k=1)
+            self.assertEqual(vectors[0].id, "1")
+            self.assertEqual(vectors[0].metadata.pop("score"), 0.9)
+
+        # Assert the results were cached after the first search
+        self.assertEqual(self.rpc_count(), 1)
+
+    def test_delete_invalidates_cache(self):
+        query = Vector(embeddings=[0.1, 0.2])
+        self.vector_store.search(vector=query, top_k=1)
+
+        self.vector_store.delete(ids=["1"])
+        self.vector_store.search(vector=query, top_k=1)
+
+        # Assert the search after the delete was sent to Supabase
+        self.assertEqual(self.rpc_count(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()